@@ -0,0 +1,11 @@
+from .generator import SPORT_MIXES, generate_activities, generate_edge_cases
+from .runner import DEFAULT_SIZES, StatisticsBenchmark, compare_results
+
+__all__ = [
+    "SPORT_MIXES",
+    "generate_activities",
+    "generate_edge_cases",
+    "DEFAULT_SIZES",
+    "StatisticsBenchmark",
+    "compare_results",
+]
@@ -0,0 +1,139 @@
+import random
+from datetime import datetime, timedelta
+
+# Pesos por esporte: (esporte, peso, distância média em metros, velocidade média em m/s)
+SPORT_MIXES = {
+    "default": [
+        ("Run", 40, 8_000, 2.9),
+        ("Ride", 20, 35_000, 7.0),
+        ("Walk", 15, 4_000, 1.4),
+        ("WeightTraining", 10, 0, 0),
+        ("Swim", 5, 1_500, 0.6),
+        ("Hike", 4, 10_000, 1.1),
+        ("Yoga", 3, 0, 0),
+        ("MountainBikeRide", 3, 25_000, 4.5),
+    ],
+    "runner": [
+        ("Run", 85, 10_000, 3.1),
+        ("Walk", 10, 4_000, 1.4),
+        ("WeightTraining", 5, 0, 0),
+    ],
+    "triathlete": [
+        ("Run", 35, 10_000, 3.1),
+        ("Ride", 35, 50_000, 8.0),
+        ("Swim", 30, 2_500, 0.8),
+    ],
+    # Inclui esportes sem tradução em TRANSLATE_ACTIVITIES
+    "multisport": [
+        ("Run", 10, 8_000, 2.9),
+        ("Ride", 10, 35_000, 7.0),
+        ("Walk", 10, 4_000, 1.4),
+        ("Workout", 10, 0, 0),
+        ("Soccer", 10, 6_000, 1.8),
+        ("Racquetball", 10, 0, 0),
+        ("Crossfit", 10, 0, 0),
+        ("Kitesurf", 10, 15_000, 5.0),
+        ("NordicSki", 10, 12_000, 3.0),
+        ("VirtualRide", 10, 30_000, 8.5),
+    ],
+}
+
+ACTIVITY_NAMES = [
+    "Treino matinal", "Longão de domingo", "Intervalado", "Regenerativo", "Pedal com amigos",
+    "Trilha 🌄", "Prova 10K", "Almoço ativo", "Noite de treino", "Morning Run",
+]
+
+# Tempo parado em atividades sem deslocamento (musculação, yoga...)
+STATIONARY_SECONDS = (1_800, 5_400)
+
+
+def generate_activities(count: int, year: int, seed: int = 0, sport_mix: str = "default",
+                        start_id: int = 1) -> list:
+    """
+    Gera atividades no formato do resumo da API Strava, espalhadas pelo ano informado.
+    O resultado depende apenas dos argumentos (mesma semente, mesmas atividades).
+    """
+    rng = random.Random(seed)
+    sports = SPORT_MIXES[sport_mix]
+    weights = [weight for _, weight, _, _ in sports]
+    first_day = datetime(year, 1, 1)
+    year_seconds = int((datetime(year + 1, 1, 1) - first_day).total_seconds())
+
+    # Horários concentrados de manhã cedo e no fim da tarde, como em atletas reais
+    offsets = sorted(
+        rng.randrange(year_seconds // 86_400) * 86_400 + _random_hour(rng) * 3_600 + rng.randrange(3_600)
+        for _ in range(count)
+    )
+
+    activities = []
+    for index, offset in enumerate(offsets):
+        sport_type, _, mean_distance, speed = rng.choices(sports, weights=weights)[0]
+        if mean_distance:
+            distance = round(max(rng.gauss(mean_distance, mean_distance * 0.35), 100.0), 1)
+            moving_time = int(distance / speed)
+        else:
+            distance = 0.0
+            moving_time = rng.randint(*STATIONARY_SECONDS)
+
+        activities.append(_make_activity(
+            activity_id=start_id + index,
+            name=rng.choice(ACTIVITY_NAMES),
+            sport_type=sport_type,
+            start_local=first_day + timedelta(seconds=offset),
+            distance=distance,
+            moving_time=moving_time,
+            elapsed_time=moving_time + rng.randrange(0, max(moving_time // 5, 1) + 1),
+            elevation=round(rng.expovariate(1 / 60), 1) if distance else 0.0,
+        ))
+
+    return activities
+
+
+def generate_edge_cases(year: int, start_id: int = 1_000_000) -> list:
+    """Atividades nas bordas do que as estatísticas precisam tratar"""
+    cases = [
+        # Viradas de ano, semana ISO e dia
+        ("Virada de ano", "Run", datetime(year, 1, 1, 0, 0, 5), 5_000.0, 1_500, 20.0),
+        ("Último minuto do ano", "Run", datetime(year, 12, 31, 23, 59, 0), 3_000.0, 900, 5.0),
+        ("Domingo à noite", "Ride", datetime(year, 1, 7, 23, 30, 0), 20_000.0, 2_400, 100.0),
+        # Sem deslocamento, atividades muito curtas e muito longas
+        ("Musculação", "WeightTraining", datetime(year, 3, 10, 7, 0, 0), 0.0, 3_600, 0.0),
+        ("Um segundo", "Run", datetime(year, 3, 10, 7, 0, 0), 1.0, 1, 0.0),
+        ("Ultra de 30 horas", "Run", datetime(year, 6, 1, 5, 0, 0), 170_000.0, 108_000, 9_000.0),
+        # Esporte sem tradução, nome vazio e nome longo com unicode
+        ("Kitesurf", "Kitesurf", datetime(year, 8, 15, 14, 0, 0), 12_000.0, 5_400, 0.0),
+        ("", "Walk", datetime(year, 9, 9, 9, 9, 9), 2_000.0, 1_500, 3.0),
+        ("Trilha " + "🏔️ " * 40 + "ção", "Hike", datetime(year, 10, 12, 6, 0, 0), 14_000.0, 18_000, 1_200.0),
+    ]
+
+    return [
+        _make_activity(start_id + index, name, sport_type, start_local, distance, moving_time,
+                       moving_time, elevation)
+        for index, (name, sport_type, start_local, distance, moving_time, elevation) in enumerate(cases)
+    ]
+
+
+def _random_hour(rng: random.Random) -> int:
+    bucket = rng.random()
+    if bucket < 0.45:
+        return rng.randint(5, 8)
+    if bucket < 0.85:
+        return rng.randint(17, 20)
+    return rng.randint(0, 23)
+
+
+def _make_activity(activity_id: int, name: str, sport_type: str, start_local: datetime, distance: float,
+                   moving_time: int, elapsed_time: int, elevation: float) -> dict:
+    # Horário de São Paulo (UTC-3); o Strava envia start_date_local com sufixo Z
+    start_utc = start_local + timedelta(hours=3)
+    return {
+        "id": activity_id,
+        "name": name,
+        "sport_type": sport_type,
+        "start_date": start_utc.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "start_date_local": start_local.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "distance": distance,
+        "moving_time": moving_time,
+        "elapsed_time": elapsed_time,
+        "total_elevation_gain": elevation,
+    }
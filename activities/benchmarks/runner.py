@@ -0,0 +1,161 @@
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import django
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.shortcuts import render
+from django.test import RequestFactory, override_settings
+
+from ..constants import get_current_year
+from ..services.filter_index import ActivityFilterIndex
+from ..services.statistics import ACTIVITY_LIST_KEYS, StatisticsService
+from ..views import _get_dashboard_context
+from .generator import generate_activities, generate_edge_cases
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 50_000)
+RESULTS_VERSION = 1
+
+
+def _operations(activities: list, year: int) -> dict:
+    """Operações medidas: nome -> função sem argumentos sobre um serviço já montado"""
+    service = StatisticsService(activities, use_cache=False, year=year)
+    first_page = service.get_activities_page()
+    request = _dashboard_request()
+
+    return {
+        "create_dataframe": lambda: service._create_dataframe(activities),
+        "init": lambda: StatisticsService(activities, use_cache=False, year=year),
+        "general_statistics": service.get_general_statistics,
+        "monthly_statistics": service.get_monthly_statistics,
+        "activity_type_statistics": service.get_activity_type_statistics,
+        "weekly_statistics": service.get_weekly_statistics,
+        "dashboard_statistics": service.get_dashboard_statistics,
+        "sport_types": service.get_sport_types,
+        "activities_by_sport_type": lambda: service.get_activities_by_sport_type("Run"),
+        "all_activities": service.get_all_activities,
+        "all_activities_paginated": service.get_all_activities_paginated,
+        "activities_page": service.get_activities_page,
+        "activities_page_next": lambda: service.get_activities_page(first_page["next_cursor"]),
+        "filter_index": lambda: ActivityFilterIndex(service.df),
+        "filtered": lambda: service.filtered("Run", "", "6", "").get_dashboard_statistics(),
+        "filtered_search": lambda: service.filtered(search_filter="treino").get_activities_page(),
+        "format_time_series": lambda: service.format_time_series(service.df["elapsed_time"]),
+        "format_activity_rows": lambda: service._format_activity_rows(service.df, ACTIVITY_LIST_KEYS),
+        "dashboard_render": lambda: render(
+            request, "activities/dashboard.html", _get_dashboard_context(request, service)
+        ),
+    }
+
+
+def _dashboard_request():
+    request = RequestFactory().get("/strava-stats/dashboard/")
+    request.session = {"athlete_name": "Benchmark"}
+    request.user = AnonymousUser()
+    return request
+
+
+def _time_call(func, repeat: int) -> dict:
+    func()  # Aquecimento (imports, caches de pandas)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+class StatisticsBenchmark:
+    """
+    Mede o custo do StatisticsService sobre atividades sintéticas determinísticas.
+    Usa o ano anterior completo, para que os resultados não dependam do dia da execução.
+    """
+
+    def __init__(self, sizes: list = None, repeat: int = 5, seed: int = 0, sport_mix: str = "default",
+                 edge_cases: bool = True, operations: list = None):
+        self.sizes = list(sizes or DEFAULT_SIZES)
+        self.repeat = max(1, repeat)
+        self.seed = seed
+        self.sport_mix = sport_mix
+        self.edge_cases = edge_cases
+        self.operations = operations
+        self.year = get_current_year() - 1
+
+    def get_datasets(self) -> dict:
+        datasets = {
+            str(size): generate_activities(size, self.year, seed=self.seed, sport_mix=self.sport_mix)
+            for size in self.sizes
+        }
+        if self.edge_cases:
+            datasets["edge_cases"] = generate_edge_cases(self.year) + generate_activities(
+                100, self.year, seed=self.seed, sport_mix="multisport"
+            )
+        return datasets
+
+    def run(self, progress=None) -> dict:
+        """Executa as medições; progress(dataset, operação, tempos) é chamado a cada resultado"""
+        results = {}
+
+        # O ano medido precisa estar dentro do histórico considerado pelo serviço
+        with override_settings(STRAVA_HISTORY_YEARS=max(settings.STRAVA_HISTORY_YEARS, 2)):
+            for dataset, activities in self.get_datasets().items():
+                results[dataset] = {}
+                for name, func in _operations(activities, self.year).items():
+                    if self.operations and name not in self.operations:
+                        continue
+                    timings = _time_call(func, self.repeat)
+                    results[dataset][name] = timings
+                    if progress:
+                        progress(dataset, name, timings)
+
+        return {
+            "version": RESULTS_VERSION,
+            "metadata": self.get_metadata(),
+            "results": results,
+        }
+
+    def get_metadata(self) -> dict:
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "seed": self.seed,
+            "sport_mix": self.sport_mix,
+            "repeat": self.repeat,
+        }
+
+
+def compare_results(current: dict, baseline: dict, threshold: float, min_delta_ms: float = 1.0) -> list:
+    """
+    Compara o tempo mínimo de cada operação com o baseline. Regressão é ficar mais de
+    `threshold` (ex.: 0.2 = 20%) e mais de `min_delta_ms` acima do baseline.
+    """
+    regressions = []
+    for dataset, operations in current["results"].items():
+        baseline_operations = baseline.get("results", {}).get(dataset, {})
+        for name, timings in operations.items():
+            if name not in baseline_operations:
+                continue
+
+            baseline_ms = baseline_operations[name]["min_ms"]
+            current_ms = timings["min_ms"]
+            if current_ms > baseline_ms * (1 + threshold) and current_ms - baseline_ms > min_delta_ms:
+                regressions.append({
+                    "dataset": dataset,
+                    "operation": name,
+                    "baseline_ms": baseline_ms,
+                    "current_ms": current_ms,
+                    "change": round(current_ms / baseline_ms - 1, 3) if baseline_ms else None,
+                })
+
+    return regressions
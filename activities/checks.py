@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# Backends cujo conteúdo só existe no processo atual
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    O uso da API Strava e os locks de single flight (cache.add) ficam no cache: com um
+    backend local ao processo cada worker enxerga só os próprios, o orçamento estoura e
+    cada worker repete a mesma busca. Erro em produção, aviso com DEBUG (runserver roda
+    um único processo).
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PER_PROCESS_CACHE_BACKENDS:
+        return []
+
+    message = (
+        f"O cache padrão ({backend}) não é compartilhado entre processos: o orçamento da API Strava "
+        "e os locks de single flight ficam por worker."
+    )
+    hint = "Use o DatabaseCache (padrão, após manage.py createcachetable) ou Redis via CACHE_BACKEND/CACHE_LOCATION."
+    if settings.DEBUG:
+        return [Warning(message, hint=hint, id="activities.W001")]
+    return [Error(message, hint=hint, id="activities.E001")]
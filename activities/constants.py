@@ -1,8 +1,41 @@
 from datetime import datetime
 
-FIRST_DAY_YEAR = datetime(datetime.now().year, 1, 1, 0, 0)
-EPOCH_TIMESTAMP = FIRST_DAY_YEAR.timestamp()
+
+def get_current_year() -> int:
+    # Calculado a cada chamada: processos longos mudam de ano sem reiniciar
+    return datetime.now().year
+
+
+def get_first_day_year(year: int = None) -> datetime:
+    return datetime(year or get_current_year(), 1, 1, 0, 0)
+
+
+def get_year_timestamp(year: int = None) -> float:
+    """Epoch do primeiro dia do ano (parâmetro after da API Strava)"""
+    return get_first_day_year(year).timestamp()
+
+
+def get_history_years(history_years: int) -> list:
+    """Anos do histórico, do mais antigo ao atual"""
+    current_year = get_current_year()
+    return list(range(current_year - max(history_years, 1) + 1, current_year + 1))
+
+
 QUANTITY_PER_PAGE = 100
+MAX_PAGES = 100  # Máximo de 10.000 atividades
+
+# Campos do resumo de atividade do Strava usados pelo app
+ACTIVITY_FIELDS = [
+    "id",
+    "name",
+    "sport_type",
+    "start_date",
+    "start_date_local",
+    "distance",
+    "moving_time",
+    "elapsed_time",
+    "total_elevation_gain",
+]
 
 TRANSLATE_ACTIVITIES = {
     "Walk": "Caminhada",
@@ -27,6 +27,11 @@ class StravaTokenExpiredError(StravaAPIError):
         super().__init__(message, 401)
 
 
+class InvalidCursorError(ValueError):
+    """Cursor de paginação malformado"""
+    pass
+
+
 class DataProcessingError(Exception):
     """Erro no processamento de dados"""
     pass
@@ -0,0 +1,9 @@
+from .driver import DashboardLoadDriver, percentile
+from .fake_strava import FakeStravaConfig, create_server
+
+__all__ = [
+    "DashboardLoadDriver",
+    "percentile",
+    "FakeStravaConfig",
+    "create_server",
+]
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+
+import httpx
+from django.contrib.sessions.backends.db import SessionStore
+
+from ..services.activity_store import ActivityStore
+from .fake_strava import REFRESH_PREFIX, TOKEN_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: list, pct: float) -> float:
+    """Percentil pelo método nearest-rank (valores já ordenados)"""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class DashboardLoadDriver:
+    """
+    Dispara requisições concorrentes ao dashboard com várias sessões autenticadas
+    (tokens do servidor Strava falso) e mede latência e chamadas ao Strava.
+    """
+
+    def __init__(self, url: str, sessions: int = 20, requests_per_session: int = 5, concurrency: int = 20,
+                 first_athlete_id: int = 1, timeout: float = 120, fake_strava_url: str = None):
+        self.url = url
+        self.sessions = max(1, sessions)
+        self.requests_per_session = max(1, requests_per_session)
+        self.concurrency = max(1, concurrency)
+        self.first_athlete_id = first_athlete_id
+        self.timeout = timeout
+        self.fake_strava_url = fake_strava_url.rstrip("/") if fake_strava_url else None
+
+    def create_sessions(self) -> list:
+        """Cria sessões no banco (mesmo banco do servidor) com tokens do Strava falso"""
+        session_keys = []
+        expires_at = int(time.time()) + 6 * 3600
+        for athlete_id in range(self.first_athlete_id, self.first_athlete_id + self.sessions):
+            token_data = {
+                "access_token": f"{TOKEN_PREFIX}{athlete_id}",
+                "refresh_token": f"{REFRESH_PREFIX}{athlete_id}",
+                "expires_at": expires_at,
+            }
+            ActivityStore.upsert_athlete(athlete_id, f"Atleta {athlete_id}")
+            ActivityStore.save_tokens(athlete_id, token_data)
+
+            session = SessionStore()
+            session.update({
+                **token_data,
+                "athlete_id": athlete_id,
+                "athlete_name": f"Atleta {athlete_id}",
+            })
+            session.create()
+            session_keys.append(session.session_key)
+        return session_keys
+
+    def run(self) -> dict:
+        session_keys = self.create_sessions()
+        upstream_before = self._get_upstream_stats()
+
+        started = time.monotonic()
+        samples = asyncio.run(self._run(session_keys))
+        duration = time.monotonic() - started
+
+        return self._build_report(samples, duration, upstream_before, self._get_upstream_stats())
+
+    async def _run(self, session_keys: list) -> list:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=False) as client:
+            async def request(session_key: str) -> tuple:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(self.url, cookies={"sessionid": session_key})
+                        status = str(response.status_code)
+                    except httpx.HTTPError as e:
+                        status = f"erro:{type(e).__name__}"
+                    return (time.perf_counter() - started) * 1000, status
+
+            # Sessões intercaladas: a primeira rodada pega todos os caches frios ao mesmo tempo
+            tasks = [
+                request(session_key)
+                for _ in range(self.requests_per_session)
+                for session_key in session_keys
+            ]
+            return await asyncio.gather(*tasks)
+
+    def _get_upstream_stats(self) -> dict | None:
+        if not self.fake_strava_url:
+            return None
+        try:
+            return httpx.get(f"{self.fake_strava_url}/_stats", timeout=10).json()
+        except httpx.HTTPError as e:
+            logger.warning(f"Não foi possível ler as estatísticas do Strava falso: {e}")
+            return None
+
+    def _build_report(self, samples: list, duration: float, upstream_before: dict | None,
+                      upstream_after: dict | None) -> dict:
+        latencies = sorted(latency for latency, _ in samples)
+        statuses = Counter(status for _, status in samples)
+
+        report = {
+            "url": self.url,
+            "sessions": self.sessions,
+            "requests": len(samples),
+            "concurrency": self.concurrency,
+            "duration_s": round(duration, 2),
+            "throughput_rps": round(len(samples) / duration, 1) if duration else 0.0,
+            "statuses": dict(sorted(statuses.items())),
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 1),
+                "p95": round(percentile(latencies, 95), 1),
+                "p99": round(percentile(latencies, 99), 1),
+                "mean": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+                "max": round(latencies[-1], 1) if latencies else 0.0,
+            },
+            "upstream": None,
+        }
+
+        if upstream_before is not None and upstream_after is not None:
+            report["upstream"] = {
+                "requests": upstream_after["requests"] - upstream_before["requests"],
+                "endpoints": self._diff(upstream_before["endpoints"], upstream_after["endpoints"]),
+                "statuses": self._diff(upstream_before["statuses"], upstream_after["statuses"]),
+            }
+        return report
+
+    @staticmethod
+    def _diff(before: dict, after: dict) -> dict:
+        return {key: value - before.get(key, 0) for key, value in after.items() if value - before.get(key, 0)}
@@ -0,0 +1,269 @@
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from ..benchmarks.generator import generate_activities
+from ..constants import get_history_years
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v3"
+TOKEN_PREFIX = "fake-token-"
+REFRESH_PREFIX = "fake-refresh-"
+SHORT_WINDOW_SECONDS = 15 * 60
+
+
+@dataclass
+class FakeStravaConfig:
+    """Comportamento do servidor falso (latência, paginação, rate limit e falhas)"""
+
+    latency: float = 0.1
+    jitter: float = 0.0
+    activities_per_year: int = 300
+    history_years: int = 3
+    max_page_size: int = 200
+    rate_limit_15min: int = 600
+    rate_limit_daily: int = 30_000
+    burst_every: int = 0
+    burst_length: int = 0
+    unauthorized_rate: float = 0.0
+    token_ttl: int = 6 * 3600
+    seed: int = 0
+
+
+class FakeStravaState:
+    """Atividades geradas por atleta e contadores das chamadas recebidas"""
+
+    def __init__(self, config: FakeStravaConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.activities = {}
+        self.counters = Counter()
+        self.window_started = time.time()
+        self.window_usage = 0
+        self.daily_usage = 0
+        self.requests_in_cycle = 0
+
+    def get_activities(self, athlete_id: int) -> list:
+        with self.lock:
+            if athlete_id not in self.activities:
+                self.activities[athlete_id] = self._generate(athlete_id)
+            return self.activities[athlete_id]
+
+    def _generate(self, athlete_id: int) -> list:
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        activities = []
+        for index, year in enumerate(get_history_years(self.config.history_years)):
+            activities.extend(generate_activities(
+                self.config.activities_per_year,
+                year,
+                seed=self.config.seed + athlete_id * 100 + index,
+                start_id=athlete_id * 1_000_000 + index * 100_000 + 1,
+            ))
+        # Sem atividades no futuro; ordem de start_date como na API
+        return sorted((activity for activity in activities if activity["start_date"] <= now),
+                      key=lambda activity: activity["start_date"])
+
+    def record(self, endpoint: str) -> tuple:
+        """Contabiliza a chamada; retorna (status forçado ou None, cabeçalhos de rate limit)"""
+        with self.lock:
+            self.counters["requests"] += 1
+            self.counters[f"endpoint:{endpoint}"] += 1
+
+            now = time.time()
+            if now - self.window_started >= SHORT_WINDOW_SECONDS:
+                self.window_started = now
+                self.window_usage = 0
+            self.window_usage += 1
+            self.daily_usage += 1
+            headers = {
+                "X-RateLimit-Limit": f"{self.config.rate_limit_15min},{self.config.rate_limit_daily}",
+                "X-RateLimit-Usage": f"{self.window_usage},{self.daily_usage}",
+            }
+
+            status = None
+            self.requests_in_cycle += 1
+            cycle = self.config.burst_every + self.config.burst_length
+            bursting = self.config.burst_every and self.config.burst_length
+            if bursting and self.requests_in_cycle > self.config.burst_every:
+                # Rajada de 429: as burst_length requisições seguintes a cada burst_every
+                status = 429
+                if self.requests_in_cycle >= cycle:
+                    self.requests_in_cycle = 0
+            elif (self.window_usage > self.config.rate_limit_15min
+                  or self.daily_usage > self.config.rate_limit_daily):
+                status = 429
+            elif self.config.unauthorized_rate and self.random.random() < self.config.unauthorized_rate:
+                status = 401
+
+            if status:
+                self.counters[f"status:{status}"] += 1
+            return status, headers
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.counters["requests"],
+                "endpoints": {
+                    key.split(":", 1)[1]: value for key, value in self.counters.items() if key.startswith("endpoint:")
+                },
+                "statuses": {
+                    key.split(":", 1)[1]: value for key, value in self.counters.items() if key.startswith("status:")
+                },
+                "rate_limit_usage": {"15min": self.window_usage, "daily": self.daily_usage},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.window_started = time.time()
+            self.window_usage = 0
+            self.daily_usage = 0
+            self.requests_in_cycle = 0
+
+
+class FakeStravaHandler(BaseHTTPRequestHandler):
+    """Endpoints do Strava usados pelo app, mais /_stats e /_reset para o driver de carga"""
+
+    server_version = "FakeStrava/1.0"
+    state: FakeStravaState = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == "/_stats":
+            return self._send_json(200, self.state.get_stats())
+        if url.path == "/oauth/authorize":
+            return self._authorize(params)
+
+        if url.path == f"{API_PREFIX}/athlete":
+            return self._api("athlete", lambda athlete_id: (200, {"id": athlete_id, "firstname": "Atleta",
+                                                                   "lastname": str(athlete_id)}))
+        if url.path == f"{API_PREFIX}/athlete/activities":
+            return self._api("athlete/activities", lambda athlete_id: (200, self._list_activities(athlete_id, params)))
+        if url.path.startswith(f"{API_PREFIX}/activities/"):
+            return self._api("activities/{id}", lambda athlete_id: self._get_activity(athlete_id, url.path))
+
+        self._send_json(404, {"message": "Record Not Found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == "/_reset":
+            self.state.reset()
+            return self._send_json(200, {"reset": True})
+        if url.path == f"{API_PREFIX}/oauth/token":
+            length = int(self.headers.get("Content-Length") or 0)
+            form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+            return self._token(form)
+
+        self._send_json(404, {"message": "Record Not Found"})
+
+    def _api(self, endpoint: str, handler):
+        self._sleep()
+        status, headers = self.state.record(endpoint)
+        athlete_id = self._get_athlete_id()
+
+        if status == 429:
+            return self._send_json(429, {"message": "Rate Limit Exceeded"}, headers)
+        if status == 401 or athlete_id is None:
+            return self._send_json(401, {"message": "Authorization Error"}, headers)
+
+        status, body = handler(athlete_id)
+        self._send_json(status, body, headers)
+
+    def _list_activities(self, athlete_id: int, params: dict) -> list:
+        after = float(params.get("after", ["0"])[0])
+        page = max(int(params.get("page", ["1"])[0]), 1)
+        per_page = min(int(params.get("per_page", ["30"])[0]), self.state.config.max_page_size)
+
+        after_text = datetime.fromtimestamp(after, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        selected = [activity for activity in self.state.get_activities(athlete_id)
+                    if activity["start_date"] > after_text]
+        return selected[(page - 1) * per_page: page * per_page]
+
+    def _get_activity(self, athlete_id: int, path: str) -> tuple:
+        try:
+            activity_id = int(path.rsplit("/", 1)[1])
+        except ValueError:
+            return 404, {"message": "Record Not Found"}
+        for activity in self.state.get_activities(athlete_id):
+            if activity["id"] == activity_id:
+                return 200, activity
+        return 404, {"message": "Record Not Found"}
+
+    def _token(self, form: dict):
+        self._sleep()
+        self.state.record("oauth/token")
+
+        if form.get("grant_type") == "authorization_code" and form.get("code", "").startswith("athlete-"):
+            athlete_id = int(form["code"].split("-", 1)[1])
+            body = self._token_payload(athlete_id)
+            body["athlete"] = {"id": athlete_id, "firstname": "Atleta", "lastname": str(athlete_id)}
+            return self._send_json(200, body)
+        if form.get("grant_type") == "refresh_token" and form.get("refresh_token", "").startswith(REFRESH_PREFIX):
+            return self._send_json(200, self._token_payload(int(form["refresh_token"][len(REFRESH_PREFIX):])))
+
+        self._send_json(400, {"message": "Bad Request", "errors": [{"field": "code", "code": "invalid"}]})
+
+    def _token_payload(self, athlete_id: int) -> dict:
+        return {
+            "token_type": "Bearer",
+            "access_token": f"{TOKEN_PREFIX}{athlete_id}",
+            "refresh_token": f"{REFRESH_PREFIX}{athlete_id}",
+            "expires_at": int(time.time()) + self.state.config.token_ttl,
+            "expires_in": self.state.config.token_ttl,
+        }
+
+    def _authorize(self, params: dict):
+        # Login local sem o Strava: ?athlete=<id> escolhe o atleta (padrão 1)
+        athlete_id = params.get("athlete", ["1"])[0]
+        redirect_uri = params.get("redirect_uri", [""])[0]
+        self.send_response(302)
+        self.send_header("Location", f"{redirect_uri}?{urlencode({'code': f'athlete-{athlete_id}'})}")
+        self.end_headers()
+
+    def _get_athlete_id(self) -> int | None:
+        authorization = self.headers.get("Authorization", "")
+        token = authorization.removeprefix("Bearer ").strip()
+        if not token.startswith(TOKEN_PREFIX):
+            return None
+        try:
+            return int(token[len(TOKEN_PREFIX):])
+        except ValueError:
+            return None
+
+    def _sleep(self):
+        config = self.state.config
+        delay = config.latency + (self.state.random.uniform(-config.jitter, config.jitter) if config.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _send_json(self, status: int, body, headers: dict = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def create_server(host: str, port: int, config: FakeStravaConfig) -> ThreadingHTTPServer:
+    """Cria o servidor (uma thread por conexão) com estado próprio"""
+    handler = type("ConfiguredFakeStravaHandler", (FakeStravaHandler,), {"state": FakeStravaState(config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.benchmarks import (
+    DEFAULT_SIZES,
+    SPORT_MIXES,
+    StatisticsBenchmark,
+    compare_results,
+)
+
+
+class Command(BaseCommand):
+    help = "Mede o custo do StatisticsService com atividades sintéticas e compara com um baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+            help=f"Quantidades de atividades medidas (padrão: {' '.join(map(str, DEFAULT_SIZES))})",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por operação (padrão: 5)")
+        parser.add_argument("--seed", type=int, default=0, help="Semente do gerador de atividades")
+        parser.add_argument(
+            "--sport-mix", choices=sorted(SPORT_MIXES), default="default",
+            help="Distribuição de esportes das atividades geradas",
+        )
+        parser.add_argument(
+            "--operation", action="append", dest="operations",
+            help="Medir apenas a operação informada (pode ser repetido)",
+        )
+        parser.add_argument("--no-edge-cases", action="store_true", help="Não medir o conjunto de casos de borda")
+        parser.add_argument("--output", help="Arquivo JSON com os resultados")
+        parser.add_argument("--baseline", help="Resultados de referência (JSON) para detectar regressões")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Aumento relativo tolerado sobre o baseline antes de falhar (padrão: 0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--save-baseline", action="store_true",
+            help="Gravar os resultados em --baseline em vez de comparar",
+        )
+
+    def handle(self, *args, **options):
+        benchmark = StatisticsBenchmark(
+            sizes=options["sizes"],
+            repeat=options["repeat"],
+            seed=options["seed"],
+            sport_mix=options["sport_mix"],
+            edge_cases=not options["no_edge_cases"],
+            operations=options["operations"],
+        )
+        results = benchmark.run(progress=self._write_progress)
+
+        if options["output"]:
+            self._write_json(options["output"], results)
+            self.stdout.write(f"Resultados gravados em {options['output']}")
+
+        baseline_path = options["baseline"]
+        if not baseline_path:
+            return
+        if options["save_baseline"]:
+            self._write_json(baseline_path, results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline gravado em {baseline_path}"))
+            return
+        if not Path(baseline_path).exists():
+            self.stdout.write(self.style.WARNING(f"Baseline {baseline_path} não encontrado, comparação ignorada"))
+            return
+
+        baseline = json.loads(Path(baseline_path).read_text())
+        regressions = compare_results(results, baseline, options["threshold"])
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"{regression['dataset']:>10} {regression['operation']:<26} "
+                f"{regression['baseline_ms']:.2f}ms -> {regression['current_ms']:.2f}ms "
+                f"(+{regression['change']:.0%})"
+            ))
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} operações acima do baseline (limite: +{options['threshold']:.0%})")
+        self.stdout.write(self.style.SUCCESS("Sem regressões em relação ao baseline"))
+
+    def _write_progress(self, dataset: str, operation: str, timings: dict):
+        self.stdout.write(
+            f"{dataset:>10} {operation:<26} min {timings['min_ms']:>9.2f}ms  mediana {timings['median_ms']:>9.2f}ms"
+        )
+
+    @staticmethod
+    def _write_json(path: str, results: dict):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(results, indent=2, ensure_ascii=False))
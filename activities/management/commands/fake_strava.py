@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+
+from activities.loadtest import FakeStravaConfig, create_server
+
+
+class Command(BaseCommand):
+    help = "Sobe um servidor local que imita a API Strava (atleta, atividades e OAuth) para testes offline"
+
+    def add_arguments(self, parser):
+        defaults = FakeStravaConfig()
+        parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+        parser.add_argument("--port", type=int, default=8001, help="Porta de escuta (padrão: 8001)")
+        parser.add_argument(
+            "--latency", type=float, default=defaults.latency,
+            help=f"Latência, em segundos, de cada resposta (padrão: {defaults.latency})",
+        )
+        parser.add_argument("--jitter", type=float, default=defaults.jitter, help="Variação aleatória da latência")
+        parser.add_argument(
+            "--activities-per-year", type=int, default=defaults.activities_per_year,
+            help=f"Atividades geradas por atleta e ano (padrão: {defaults.activities_per_year})",
+        )
+        parser.add_argument(
+            "--history-years", type=int, default=defaults.history_years,
+            help="Anos de histórico gerados por atleta",
+        )
+        parser.add_argument(
+            "--max-page-size", type=int, default=defaults.max_page_size,
+            help="Máximo de atividades por página, independente do per_page pedido",
+        )
+        parser.add_argument("--rate-limit-15min", type=int, default=defaults.rate_limit_15min)
+        parser.add_argument("--rate-limit-daily", type=int, default=defaults.rate_limit_daily)
+        parser.add_argument(
+            "--burst-every", type=int, default=0,
+            help="A cada N requisições, responder 429 às --burst-length seguintes",
+        )
+        parser.add_argument("--burst-length", type=int, default=0, help="Tamanho de cada rajada de 429")
+        parser.add_argument(
+            "--unauthorized-rate", type=float, default=0.0,
+            help="Fração (0-1) das chamadas à API respondidas com 401",
+        )
+        parser.add_argument("--seed", type=int, default=defaults.seed, help="Semente das atividades e falhas")
+
+    def handle(self, *args, **options):
+        config = FakeStravaConfig(
+            latency=options["latency"],
+            jitter=options["jitter"],
+            activities_per_year=options["activities_per_year"],
+            history_years=options["history_years"],
+            max_page_size=options["max_page_size"],
+            rate_limit_15min=options["rate_limit_15min"],
+            rate_limit_daily=options["rate_limit_daily"],
+            burst_every=options["burst_every"],
+            burst_length=options["burst_length"],
+            unauthorized_rate=options["unauthorized_rate"],
+            seed=options["seed"],
+        )
+        server = create_server(options["host"], options["port"], config)
+        base_url = f"http://{options['host']}:{options['port']}"
+
+        self.stdout.write(self.style.SUCCESS(f"Strava falso em {base_url}"))
+        self.stdout.write("Aponte o app para ele com:")
+        self.stdout.write(f"  STRAVA_API_BASE_URL={base_url}/api/v3")
+        self.stdout.write(f"  STRAVA_TOKEN_URL={base_url}/api/v3/oauth/token")
+        self.stdout.write(f"  STRAVA_AUTH_URL={base_url}/oauth/authorize")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
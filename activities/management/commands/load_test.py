@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.loadtest import DashboardLoadDriver
+
+
+class Command(BaseCommand):
+    help = "Teste de carga do dashboard com várias sessões concorrentes (use com o servidor fake_strava)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="http://localhost:8000/strava-stats/dashboard/",
+            help="URL do dashboard sob teste",
+        )
+        parser.add_argument(
+            "--fake-strava-url", default="http://127.0.0.1:8001",
+            help="Servidor fake_strava, para contar as chamadas ao Strava (vazio desativa)",
+        )
+        parser.add_argument("--sessions", type=int, default=20, help="Sessões (atletas) distintas")
+        parser.add_argument("--requests", type=int, default=5, help="Requisições por sessão")
+        parser.add_argument("--concurrency", type=int, default=20, help="Requisições simultâneas")
+        parser.add_argument("--first-athlete-id", type=int, default=1, help="Id do primeiro atleta das sessões")
+        parser.add_argument("--timeout", type=float, default=120, help="Timeout de cada requisição (segundos)")
+        parser.add_argument("--output", help="Arquivo JSON com o relatório")
+
+    def handle(self, *args, **options):
+        driver = DashboardLoadDriver(
+            url=options["url"],
+            sessions=options["sessions"],
+            requests_per_session=options["requests"],
+            concurrency=options["concurrency"],
+            first_athlete_id=options["first_athlete_id"],
+            timeout=options["timeout"],
+            fake_strava_url=options["fake_strava_url"] or None,
+        )
+        report = driver.run()
+
+        latency = report["latency_ms"]
+        self.stdout.write(
+            f"{report['requests']} requisições em {report['duration_s']}s "
+            f"({report['throughput_rps']} req/s, concorrência {report['concurrency']})"
+        )
+        self.stdout.write(
+            f"Latência (ms): p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  "
+            f"média {latency['mean']}  máx {latency['max']}"
+        )
+        self.stdout.write(f"Status: {report['statuses']}")
+        if report["upstream"] is not None:
+            upstream = report["upstream"]
+            self.stdout.write(
+                f"Chamadas ao Strava: {upstream['requests']} {upstream['endpoints']} status {upstream['statuses']}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Relatório gravado em {options['output']}")
+
+        if not report["statuses"].get("200"):
+            raise CommandError("Nenhuma requisição bem-sucedida")
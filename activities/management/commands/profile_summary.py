@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.services.profiling import load_profiles, merge_stacks, summarize
+
+
+class Command(BaseCommand):
+    help = "Resume as funções mais frequentes nos perfis gravados pelo SamplingProfilerMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=settings.PROFILING_DIR, help="Diretório dos perfis")
+        parser.add_argument("--view", help="Apenas perfis desta view (ex.: dashboard)")
+        parser.add_argument("--athlete", type=int, help="Apenas perfis deste atleta")
+        parser.add_argument(
+            "--min-activities", type=int, default=0,
+            help="Apenas perfis de atletas com pelo menos N atividades no histórico",
+        )
+        parser.add_argument("--limit", type=int, default=25, help="Funções listadas")
+        parser.add_argument(
+            "--sort", choices=["self", "total"], default="self",
+            help="self: amostras executando a própria função; total: com a função em qualquer ponto da pilha",
+        )
+        parser.add_argument("--slowest", type=int, default=5, help="Perfis mais lentos listados")
+        parser.add_argument(
+            "--folded",
+            help="Grava as pilhas somadas no formato folded (flamegraph.pl, speedscope)",
+        )
+
+    def handle(self, *args, **options):
+        profiles = load_profiles(
+            options["dir"],
+            view=options["view"],
+            athlete_id=options["athlete"],
+            min_activities=options["min_activities"],
+        )
+        if not profiles:
+            raise CommandError(f"Nenhum perfil encontrado em {options['dir']}")
+
+        stacks = merge_stacks(profiles)
+        self.stdout.write(f"{len(profiles)} perfis, {sum(stacks.values())} amostras de pilha")
+
+        self.stdout.write("\nPerfis mais lentos:")
+        slowest = sorted(profiles, key=lambda profile: profile["duration_ms"], reverse=True)
+        for profile in slowest[:options["slowest"]]:
+            self.stdout.write(
+                f"  {profile['duration_ms']:>9.1f} ms  {profile['view']:<20} atleta {profile.get('athlete_id', '-')}  "
+                f"{profile.get('activities', '-')} atividades  {profile['created_at']}  {profile['phases_ms'] or ''}"
+            )
+
+        self.stdout.write(f"\n{'self %':>7} {'total %':>8}  função")
+        for row in summarize(profiles, options["limit"], options["sort"]):
+            self.stdout.write(f"{row['self_pct']:>7.1f} {row['total_pct']:>8.1f}  {row['function']}")
+
+        if options["folded"]:
+            with open(options["folded"], "w") as output:
+                for stack, count in stacks.most_common():
+                    output.write(f"{stack} {count}\n")
+            self.stdout.write(f"\nPilhas gravadas em {options['folded']}")
@@ -0,0 +1,75 @@
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Envia eventos de exemplo do Strava para o endpoint de webhook (simula o Strava localmente)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="http://localhost:8000/strava-stats/webhook/",
+            help="URL do endpoint de webhook",
+        )
+        parser.add_argument("--owner-id", type=int, required=True, help="Id do atleta no Strava")
+        parser.add_argument("--object-id", type=int, help="Id da atividade (eventos de atividade)")
+        parser.add_argument(
+            "--aspect", choices=["create", "update", "delete"], default="create",
+            help="Tipo do evento de atividade",
+        )
+        parser.add_argument(
+            "--deauthorize", action="store_true",
+            help="Enviar o evento de atleta que revogou o acesso",
+        )
+        parser.add_argument(
+            "--subscription-id", type=int, default=settings.STRAVA_WEBHOOK_SUBSCRIPTION_ID,
+            help="subscription_id enviado no evento",
+        )
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Antes do evento, testar o handshake de inscrição (GET com hub.challenge)",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            self._verify(options["url"])
+
+        if options["deauthorize"]:
+            event = self._build_event(options, "athlete", "update", options["owner_id"], {"authorized": "false"})
+        else:
+            if not options["object_id"]:
+                raise CommandError("Informe --object-id para eventos de atividade")
+            updates = {"title": "Atividade atualizada"} if options["aspect"] == "update" else {}
+            event = self._build_event(options, "activity", options["aspect"], options["object_id"], updates)
+
+        response = requests.post(options["url"], json=event, timeout=10)
+        self.stdout.write(f"POST {event['object_type']}/{event['aspect_type']}: {response.status_code}")
+        if response.status_code != 200:
+            raise CommandError(f"Evento recusado: {response.text}")
+
+    @staticmethod
+    def _build_event(options, object_type: str, aspect_type: str, object_id: int, updates: dict) -> dict:
+        # Mesmo formato do payload enviado pelo Strava
+        return {
+            "aspect_type": aspect_type,
+            "event_time": int(time.time()),
+            "object_id": object_id,
+            "object_type": object_type,
+            "owner_id": options["owner_id"],
+            "subscription_id": options["subscription_id"],
+            "updates": updates,
+        }
+
+    def _verify(self, url: str):
+        challenge = f"challenge-{int(time.time())}"
+        response = requests.get(url, params={
+            "hub.mode": "subscribe",
+            "hub.verify_token": settings.STRAVA_WEBHOOK_VERIFY_TOKEN,
+            "hub.challenge": challenge,
+        }, timeout=10)
+
+        if response.status_code != 200 or response.json().get("hub.challenge") != challenge:
+            raise CommandError(f"Handshake recusado: {response.status_code} {response.text}")
+        self.stdout.write(self.style.SUCCESS("Handshake de inscrição OK"))
@@ -0,0 +1,61 @@
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from activities.services import ActivitySyncService, StravaWebhookService
+
+
+class Command(BaseCommand):
+    help = "Sincroniza as atividades de todos os atletas conhecidos (aquece armazenamento e cache)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--athlete", type=int, action="append", dest="athlete_ids",
+            help="Sincronizar apenas o atleta informado (pode ser repetido)",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help=f"Atletas sincronizados em paralelo (padrão: {settings.STRAVA_SYNC_WORKERS})",
+        )
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Executar continuamente, repetindo a cada --interval segundos",
+        )
+        parser.add_argument(
+            "--interval", type=int, default=settings.STRAVA_SYNC_INTERVAL,
+            help=f"Intervalo entre execuções no modo --loop (padrão: {settings.STRAVA_SYNC_INTERVAL})",
+        )
+
+    def handle(self, *args, **options):
+        sync_service = ActivitySyncService(max_workers=options["workers"])
+        webhook_service = StravaWebhookService()
+
+        while True:
+            started = time.monotonic()
+            # Eventos do webhook que ficaram no banco (ex.: worker reiniciado antes de processá-los)
+            processed = webhook_service.process_pending()
+            if processed:
+                self.stdout.write(f"{processed} eventos pendentes do webhook processados")
+
+            results = sync_service.sync_all(options["athlete_ids"])
+
+            for result in results:
+                line = f"Atleta {result['athlete_id']}: {result['status']}"
+                if "activities" in result:
+                    line += f" ({result['activities']} atividades em {result['seconds']}s)"
+                if result.get("detail"):
+                    line += f" - {result['detail']}"
+                style = self.style.SUCCESS if result["status"] == "ok" else self.style.WARNING
+                self.stdout.write(style(line))
+
+            summary = Counter(result["status"] for result in results)
+            self.stdout.write(
+                f"{len(results)} atletas em {time.monotonic() - started:.1f}s: "
+                f"{summary['ok']} ok, {summary['skipped']} adiados, {summary['error']} com erro"
+            )
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
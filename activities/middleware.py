@@ -0,0 +1,107 @@
+import sys
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+
+from .services import metrics, profiling
+from .services.executor import run_sync
+
+
+class ServerTimingMiddleware:
+    """
+    Coleta as fases do request (services.metrics) e as envia no cabeçalho Server-Timing,
+    registrando também a duração total por view. Com METRICS_ENABLED desligado o Django
+    remove o middleware da cadeia.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = metrics.finish_request(token)
+        return self._add_timings(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings = metrics.finish_request(token)
+        return self._add_timings(request, response, timings, time.perf_counter() - started)
+
+    @staticmethod
+    def _add_timings(request, response, timings: dict, duration: float):
+        view = request.resolver_match.url_name if request.resolver_match else "unknown"
+        metrics.registry.observe("request_seconds", duration, view=view or "unknown")
+
+        response["Server-Timing"] = metrics.format_server_timing({**timings, "total": duration})
+        return response
+
+
+class SamplingProfilerMiddleware:
+    """
+    Amostra as pilhas de uma fração dos requests (PROFILING_SAMPLE_RATE) e dos requests de
+    usuários staff com ?profile=1, gravando os perfis em PROFILING_DIR. Com PROFILING_ENABLED
+    desligado o Django remove o middleware da cadeia.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not profiling.is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        reason = profiling.get_reason(request, lambda: request.user.is_staff)
+        if reason is None:
+            return self.get_response(request)
+
+        profile = profiling.start_profile(reason, sys._getframe())
+        try:
+            response = self.get_response(request)
+        finally:
+            profiling.finish_profile(profile)
+        profiling.save_profile(profile, request, response)
+        return response
+
+    async def __acall__(self, request):
+        # O usuário só é carregado (sessão e banco) quando o gatilho aparece na URL
+        user = await request.auser() if request.GET.get(profiling.TRIGGER_PARAM) else None
+        reason = profiling.get_reason(request, lambda: user is not None and user.is_staff)
+        if reason is None:
+            return await self.get_response(request)
+
+        # No event loop, só contam as amostras em que esta corrotina está executando
+        profile = profiling.start_profile(reason, sys._getframe())
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiling.finish_profile(profile)
+        await run_sync(profiling.save_profile, profile, request, response)
+        return response
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Athlete',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('profile', models.URLField(blank=True, max_length=500, null=True)),
+                ('synced_after', models.DateTimeField(blank=True, null=True)),
+                ('last_full_sync_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Activity',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('sport_type', models.CharField(max_length=64)),
+                ('start_date', models.DateTimeField()),
+                ('start_date_local', models.DateTimeField()),
+                ('distance', models.FloatField(default=0)),
+                ('moving_time', models.IntegerField(default=0)),
+                ('elapsed_time', models.IntegerField(default=0)),
+                ('total_elevation_gain', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='activities.athlete')),
+            ],
+            options={
+                'ordering': ['start_date_local'],
+                'indexes': [models.Index(fields=['athlete', 'start_date_local'], name='activity_athlete_date_idx'), models.Index(fields=['athlete', 'sport_type'], name='activity_athlete_sport_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import models
+
+
+class Athlete(models.Model):
+    """Atleta Strava (o id é o mesmo do Strava)"""
+
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=255, blank=True)
+    profile = models.URLField(max_length=500, blank=True, null=True)
+    synced_after = models.DateTimeField(null=True, blank=True)
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)
+    # Tokens OAuth para sincronizar em segundo plano, sem sessão do navegador
+    access_token = models.CharField(max_length=255, blank=True)
+    refresh_token = models.CharField(max_length=255, blank=True)
+    token_expires_at = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name or str(self.id)
+
+
+class Activity(models.Model):
+    """Resumo de uma atividade Strava, apenas com os campos usados pelo app"""
+
+    id = models.BigIntegerField(primary_key=True)
+    athlete = models.ForeignKey(Athlete, on_delete=models.CASCADE, related_name="activities")
+    name = models.CharField(max_length=255, blank=True)
+    sport_type = models.CharField(max_length=64)
+    start_date = models.DateTimeField()
+    start_date_local = models.DateTimeField()
+    distance = models.FloatField(default=0)
+    moving_time = models.IntegerField(default=0)
+    elapsed_time = models.IntegerField(default=0)
+    total_elevation_gain = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["start_date_local"]
+        indexes = [
+            models.Index(fields=["athlete", "start_date_local"], name="activity_athlete_date_idx"),
+            models.Index(fields=["athlete", "sport_type"], name="activity_athlete_sport_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.sport_type})"
+
+
+class WebhookEvent(models.Model):
+    """Evento de push do Strava gravado antes da resposta, até ser processado por algum worker"""
+
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    # Worker que está processando o evento; reivindicações antigas são de workers encerrados
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.payload.get('object_type')} {self.payload.get('object_id')} ({self.payload.get('aspect_type')})"
@@ -1,5 +1,17 @@
-from .strava_auth import StravaAuthService
-from .strava_api import StravaAPIService
+from .activity_store import ActivityStore
+from .strava_auth import AsyncStravaAuthService, StravaAuthService
+from .strava_api import AsyncStravaAPIService, StravaAPIService
 from .statistics import StatisticsService
+from .sync_service import ActivitySyncService
+from .webhook_service import StravaWebhookService
 
-__all__ = ["StravaAuthService", "StravaAPIService", "StatisticsService"]
+__all__ = [
+    "ActivityStore",
+    "StravaAuthService",
+    "StravaAPIService",
+    "AsyncStravaAuthService",
+    "AsyncStravaAPIService",
+    "StatisticsService",
+    "ActivitySyncService",
+    "StravaWebhookService",
+]
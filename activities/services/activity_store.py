@@ -0,0 +1,191 @@
+import logging
+from datetime import datetime, timezone
+
+import pandas as pd
+from django.db import transaction
+from django.db.models import Max
+
+from ..constants import ACTIVITY_FIELDS
+from ..models import Activity, Athlete
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FIELDS = ("start_date", "start_date_local")
+
+
+class ActivityStore:
+    """Armazenamento persistente e indexado das atividades por atleta"""
+
+    @staticmethod
+    def _parse_datetime(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    @staticmethod
+    def _format_datetime(value: datetime) -> str:
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    @staticmethod
+    def upsert_athlete(athlete_id: int, name: str = "", profile: str = None) -> Athlete:
+        """Cria ou atualiza o atleta"""
+        athlete, _ = Athlete.objects.update_or_create(
+            id=athlete_id,
+            defaults={"name": name, "profile": profile},
+        )
+        return athlete
+
+    @staticmethod
+    def save_tokens(athlete_id: int, token_data: dict):
+        """Guarda os tokens OAuth do atleta para a sincronização em segundo plano"""
+        Athlete.objects.filter(id=athlete_id).update(
+            access_token=token_data.get("access_token") or "",
+            refresh_token=token_data.get("refresh_token") or "",
+            token_expires_at=token_data.get("expires_at"),
+        )
+
+    @staticmethod
+    def get_tokens(athlete_id: int) -> dict | None:
+        """Tokens OAuth salvos do atleta, no formato da resposta de token do Strava"""
+        athlete = Athlete.objects.filter(id=athlete_id).exclude(access_token="").first()
+        if athlete is None:
+            return None
+        return {
+            "access_token": athlete.access_token,
+            "refresh_token": athlete.refresh_token,
+            "expires_at": athlete.token_expires_at,
+        }
+
+    @staticmethod
+    def get_syncable_athletes(athlete_ids: list = None) -> list:
+        """Atletas com refresh token salvo (podem ser sincronizados sem sessão)"""
+        queryset = Athlete.objects.exclude(refresh_token="")
+        if athlete_ids:
+            queryset = queryset.filter(id__in=athlete_ids)
+        return list(queryset.order_by("last_full_sync_at", "id"))
+
+    @classmethod
+    def _to_model(cls, athlete_id: int, activity: dict) -> Activity:
+        return Activity(
+            id=activity["id"],
+            athlete_id=athlete_id,
+            name=activity.get("name") or "",
+            sport_type=activity.get("sport_type") or "",
+            start_date=cls._parse_datetime(activity["start_date"]),
+            start_date_local=cls._parse_datetime(activity["start_date_local"]),
+            distance=activity.get("distance") or 0,
+            moving_time=activity.get("moving_time") or 0,
+            elapsed_time=activity.get("elapsed_time") or 0,
+            total_elevation_gain=activity.get("total_elevation_gain") or 0,
+        )
+
+    @classmethod
+    def sync_activities(cls, athlete_id: int, activities: list, window_start: float, full_sync: bool = False):
+        """
+        Grava (upsert) as atividades e remove as que não vieram da API dentro da
+        janela sincronizada (start_date > window_start).
+        """
+        window_start_dt = datetime.fromtimestamp(window_start, tz=timezone.utc)
+        objs = [cls._to_model(athlete_id, activity) for activity in activities]
+
+        with transaction.atomic():
+            Athlete.objects.get_or_create(id=athlete_id)
+            Activity.objects.bulk_create(
+                objs,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=[field for field in ACTIVITY_FIELDS if field != "id"],
+            )
+            deleted, _ = (
+                Activity.objects.filter(athlete_id=athlete_id, start_date__gt=window_start_dt)
+                .exclude(id__in=[obj.id for obj in objs])
+                .delete()
+            )
+
+            if full_sync:
+                Athlete.objects.filter(id=athlete_id).update(
+                    synced_after=window_start_dt,
+                    last_full_sync_at=datetime.now(timezone.utc),
+                )
+
+        logger.info(f"{len(objs)} atividades gravadas e {deleted} removidas para o atleta {athlete_id}")
+
+    @classmethod
+    def upsert_activity(cls, athlete_id: int, activity: dict):
+        """Grava (cria ou atualiza) uma única atividade"""
+        with transaction.atomic():
+            Athlete.objects.get_or_create(id=athlete_id)
+            Activity.objects.bulk_create(
+                [cls._to_model(athlete_id, activity)],
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=[field for field in ACTIVITY_FIELDS if field != "id"],
+            )
+
+    @staticmethod
+    def delete_activity(athlete_id: int, activity_id: int) -> bool:
+        """Remove uma atividade do atleta; retorna se ela existia"""
+        deleted, _ = Activity.objects.filter(athlete_id=athlete_id, id=activity_id).delete()
+        return bool(deleted)
+
+    @staticmethod
+    def delete_athlete(athlete_id: int):
+        """Remove o atleta e todas as suas atividades (ex.: revogou o acesso)"""
+        Athlete.objects.filter(id=athlete_id).delete()
+
+    @classmethod
+    def get_sync_state(cls, athlete_id: int, after_timestamp: float) -> dict | None:
+        """
+        Reconstrói o estado de sincronização a partir do banco, permitindo retomar a
+        sincronização incremental após reinício do processo ou expiração do cache.
+        """
+        athlete = Athlete.objects.filter(id=athlete_id).first()
+        if not athlete or not athlete.last_full_sync_at or not athlete.synced_after:
+            return None
+
+        if athlete.synced_after.timestamp() > after_timestamp:
+            return None
+
+        after_dt = datetime.fromtimestamp(after_timestamp, tz=timezone.utc)
+        latest = (
+            Activity.objects.filter(athlete_id=athlete_id, start_date__gt=after_dt)
+            .aggregate(latest=Max("start_date"))["latest"]
+        )
+        return {
+            "after_timestamp": after_timestamp,
+            "watermark": latest.timestamp() if latest else after_timestamp,
+            "last_full_sync": athlete.last_full_sync_at.timestamp(),
+        }
+
+    @classmethod
+    def get_activities(cls, athlete_id: int, after_timestamp: float) -> list:
+        """Retorna as atividades no mesmo formato do payload da API Strava"""
+        after_dt = datetime.fromtimestamp(after_timestamp, tz=timezone.utc)
+        rows = (
+            Activity.objects.filter(athlete_id=athlete_id, start_date__gt=after_dt)
+            .order_by("start_date")
+            .values(*ACTIVITY_FIELDS)
+        )
+
+        activities = []
+        for row in rows:
+            for field in DATETIME_FIELDS:
+                row[field] = cls._format_datetime(row[field])
+            activities.append(row)
+        return activities
+
+    @staticmethod
+    def load_dataframe(athlete_id: int, start: datetime = None, end: datetime = None,
+                       columns: list = None, sport_type: str = None) -> pd.DataFrame:
+        """Carrega apenas as colunas e o intervalo de datas (start_date_local) necessários"""
+        columns = columns or ACTIVITY_FIELDS
+        queryset = Activity.objects.filter(athlete_id=athlete_id)
+
+        if start is not None:
+            queryset = queryset.filter(start_date_local__gt=start)
+        if end is not None:
+            queryset = queryset.filter(start_date_local__lte=end)
+        if sport_type:
+            queryset = queryset.filter(sport_type=sport_type)
+
+        rows = queryset.order_by("start_date_local").values_list(*columns)
+        return pd.DataFrame.from_records(list(rows), columns=columns)
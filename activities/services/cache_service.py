@@ -1,60 +1,226 @@
 import hashlib
 import logging
+import pickle
+import time
 from django.core.cache import cache
 from django.conf import settings
 
+from ..constants import ACTIVITY_FIELDS
+from .serialization import decode_activities, encode_activities
+
 logger = logging.getLogger(__name__)
 
 
 class CacheService:
-    """Serviço centralizado para gerenciamento de cache"""
-    
+    """
+    Serviço centralizado para gerenciamento de cache.
+
+    As chaves de cada atleta ficam em um namespace com o id do Strava e a geração
+    atual do atleta. Invalidar incrementa a geração: as chaves antigas deixam de ser
+    lidas e expiram sozinhas, sem afetar os demais atletas.
+    """
+
     @staticmethod
     def get_cache_key(prefix: str, *args) -> str:
         """Gera chave de cache única baseada em prefixo e argumentos"""
         key_data = ":".join(str(arg) for arg in args)
         key_hash = hashlib.md5(key_data.encode()).hexdigest()
         return f"strava_stats:{prefix}:{key_hash}"
-    
+
     @staticmethod
-    def get_activities(user_id: str, access_token: str):
-        """Recupera atividades do cache"""
-        cache_key = CacheService.get_cache_key("activities", user_id, access_token[:10])
-        return cache.get(cache_key)
-    
+    def _generation_key(athlete_id) -> str:
+        return f"strava_stats:athlete:{athlete_id}:generation"
+
+    @staticmethod
+    def get_generation(athlete_id) -> int:
+        """Geração atual do namespace do atleta"""
+        generation_key = CacheService._generation_key(athlete_id)
+        generation = cache.get(generation_key)
+        if generation is None:
+            # Semear com o relógio: se o contador for descartado, não reaproveita gerações antigas
+            cache.add(generation_key, time.time_ns() // 1000, timeout=None)
+            generation = cache.get(generation_key)
+        return generation
+
+    @staticmethod
+    def get_athlete_key(athlete_id, prefix: str, *args) -> str:
+        """Gera chave no namespace (atleta + geração) do atleta"""
+        generation = CacheService.get_generation(athlete_id)
+        key_data = ":".join(str(arg) for arg in args)
+        key_hash = hashlib.md5(key_data.encode()).hexdigest()
+        return f"strava_stats:athlete:{athlete_id}:{generation}:{prefix}:{key_hash}"
+
+    @staticmethod
+    def get_activities(athlete_id):
+        """Recupera atividades do cache (inclusive as já vencidas pelo TTL suave)"""
+        entry = CacheService.get_activities_entry(athlete_id)
+        return entry[0] if entry else None
+
     @staticmethod
-    def set_activities(user_id: str, access_token: str, activities: list):
-        """Armazena atividades no cache"""
-        cache_key = CacheService.get_cache_key("activities", user_id, access_token[:10])
+    def get_activities_entry(athlete_id) -> tuple | None:
+        """
+        Recupera (atividades, stale) do cache. stale indica que o TTL suave venceu: os
+        dados ainda podem ser servidos, mas devem ser atualizados em segundo plano.
+        """
+        cache_key = CacheService.get_athlete_key(athlete_id, "activities")
+        entry = cache.get(cache_key)
+        if entry is None:
+            return None
+
+        activities = CacheService._decode_activities(entry["payload"])
+        if activities is None:
+            return None
+        return activities, time.time() >= entry["fresh_until"]
+
+    @staticmethod
+    def set_activities(athlete_id, activities: list) -> str:
+        """
+        Armazena atividades no cache e retorna a versão dos dados. A entrada fica fresca
+        por CACHE_TIMEOUT_ACTIVITIES e ainda pode ser servida (stale) por mais
+        CACHE_STALE_TIMEOUT_ACTIVITIES antes de expirar.
+        """
+        cache_key = CacheService.get_athlete_key(athlete_id, "activities")
+        version_key = CacheService.get_athlete_key(athlete_id, "activities_version")
+        data_version = CacheService.compute_data_version(activities)
         try:
-            cache.set(cache_key, activities, timeout=settings.CACHE_TIMEOUT_ACTIVITIES)
-            logger.info(f"Atividades cacheadas para usuário {user_id}")
+            payload = encode_activities(activities)
+            fresh_until = time.time() + settings.CACHE_TIMEOUT_ACTIVITIES
+            entry = {"payload": payload, "fresh_until": fresh_until}
+            cache.set_many(
+                {cache_key: entry, version_key: {"data_version": data_version, "fresh_until": fresh_until}},
+                timeout=settings.CACHE_TIMEOUT_ACTIVITIES + settings.CACHE_STALE_TIMEOUT_ACTIVITIES,
+            )
+            logger.info(f"Atividades cacheadas para atleta {athlete_id} ({len(payload)} bytes)")
         except Exception as e:
             logger.error(f"Erro ao cachear atividades: {e}")
-    
+        return data_version
+
+    @staticmethod
+    def _decode_activities(payload):
+        if payload is None:
+            return None
+
+        try:
+            return decode_activities(payload)
+        except Exception as e:
+            logger.error(f"Erro ao desserializar atividades: {e}")
+            return None
+
+    @staticmethod
+    def get_activities_version(athlete_id):
+        """Recupera a versão dos dados das atividades em cache"""
+        status = CacheService.get_activities_status(athlete_id)
+        return status[0] if status else None
+
+    @staticmethod
+    def get_activities_status(athlete_id) -> tuple | None:
+        """(versão dos dados, stale) das atividades em cache, sem ler nem decodificar o payload"""
+        version_key = CacheService.get_athlete_key(athlete_id, "activities_version")
+        entry = cache.get(version_key)
+        if entry is None:
+            return None
+        return entry["data_version"], time.time() >= entry["fresh_until"]
+
+    @staticmethod
+    def compute_data_version(activities: list) -> str:
+        """Fingerprint do conjunto de atividades (muda quando algum campo usado muda)"""
+        rows = [tuple(activity.get(field) for field in ACTIVITY_FIELDS) for activity in activities]
+        return hashlib.md5(repr(rows).encode()).hexdigest()
+
+    @staticmethod
+    def get_dataframe(athlete_id, data_version: str):
+        """Recupera o DataFrame tipado já processado"""
+        cache_key = CacheService.get_athlete_key(athlete_id, "dataframe", data_version)
+        payload = cache.get(cache_key)
+        if payload is None:
+            return None
+
+        try:
+            return pickle.loads(payload)
+        except Exception as e:
+            logger.error(f"Erro ao desserializar DataFrame: {e}")
+            return None
+
+    @staticmethod
+    def set_dataframe(athlete_id, data_version: str, df):
+        """Armazena o DataFrame tipado serializado em binário"""
+        cache_key = CacheService.get_athlete_key(athlete_id, "dataframe", data_version)
+        try:
+            payload = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+            cache.set(cache_key, payload, timeout=settings.CACHE_TIMEOUT_DATAFRAME)
+            logger.info(f"DataFrame cacheado para atleta {athlete_id} ({len(payload)} bytes)")
+        except Exception as e:
+            logger.error(f"Erro ao cachear DataFrame: {e}")
+
+    @staticmethod
+    def get_filter_index(athlete_id, data_version: str):
+        """Recupera o índice de filtros da versão dos dados"""
+        cache_key = CacheService.get_athlete_key(athlete_id, "filter_index", data_version)
+        return cache.get(cache_key)
+
+    @staticmethod
+    def set_filter_index(athlete_id, data_version: str, filter_index):
+        """Armazena o índice de filtros da versão dos dados"""
+        cache_key = CacheService.get_athlete_key(athlete_id, "filter_index", data_version)
+        try:
+            cache.set(cache_key, filter_index, timeout=settings.CACHE_TIMEOUT_DATAFRAME)
+        except Exception as e:
+            logger.error(f"Erro ao cachear índice de filtros: {e}")
+
+    @staticmethod
+    def get_sync_state(athlete_id):
+        """Recupera o estado de sincronização incremental do atleta"""
+        # Fora da geração: após invalidar, a próxima busca continua incremental
+        cache_key = CacheService.get_cache_key("sync_state", athlete_id)
+        return cache.get(cache_key)
+
+    @staticmethod
+    def set_sync_state(athlete_id, sync_state: dict):
+        """
+        Armazena o estado de sincronização incremental (intervalo, watermark e última
+        reconciliação). As atividades ficam só na entrada de atividades e no banco.
+        """
+        cache_key = CacheService.get_cache_key("sync_state", athlete_id)
+        try:
+            cache.set(cache_key, sync_state, timeout=settings.CACHE_TIMEOUT_SYNC_STATE)
+            logger.info(f"Estado de sincronização salvo para atleta {athlete_id}")
+        except Exception as e:
+            logger.error(f"Erro ao salvar estado de sincronização: {e}")
+
     @staticmethod
-    def get_stats(user_id: str, stats_type: str):
+    def delete_sync_state(athlete_id):
+        """Remove o estado de sincronização incremental do atleta"""
+        cache.delete(CacheService.get_cache_key("sync_state", athlete_id))
+
+    @staticmethod
+    def get_stats(athlete_id, stats_type: str):
         """Recupera estatísticas do cache"""
-        cache_key = CacheService.get_cache_key("stats", user_id, stats_type)
+        cache_key = CacheService.get_athlete_key(athlete_id, "stats", stats_type)
         return cache.get(cache_key)
-    
+
     @staticmethod
-    def set_stats(user_id: str, stats_type: str, stats_data: dict):
-        """Armazena estatísticas no cache"""
-        cache_key = CacheService.get_cache_key("stats", user_id, stats_type)
+    def set_stats(athlete_id, stats_type: str, stats_data: dict, permanent: bool = False):
+        """Armazena estatísticas no cache (permanent: sem expiração, para dados imutáveis)"""
+        cache_key = CacheService.get_athlete_key(athlete_id, "stats", stats_type)
         try:
-            cache.set(cache_key, stats_data, timeout=settings.CACHE_TIMEOUT_STATS)
-            logger.info(f"Estatísticas {stats_type} cacheadas para usuário {user_id}")
+            timeout = None if permanent else settings.CACHE_TIMEOUT_STATS
+            cache.set(cache_key, stats_data, timeout=timeout)
+            logger.info(f"Estatísticas {stats_type} cacheadas para atleta {athlete_id}")
         except Exception as e:
             logger.error(f"Erro ao cachear estatísticas {stats_type}: {e}")
-    
+
     @staticmethod
-    def invalidate_user_cache(user_id: str):
-        """Invalida todo o cache de um usuário"""
+    def invalidate_user_cache(athlete_id):
+        """Invalida o cache de um atleta (O(1), sem afetar os demais)"""
+        generation_key = CacheService._generation_key(athlete_id)
         try:
-            # Em produção, poderíamos usar cache.delete_many com pattern matching
-            # Por ora, limpamos o cache completamente
-            cache.clear()
-            logger.info(f"Cache invalidado para usuário {user_id}")
+            CacheService.get_generation(athlete_id)
+            try:
+                cache.incr(generation_key)
+            except ValueError:
+                # Contador descartado entre a leitura e o incremento
+                CacheService.get_generation(athlete_id)
+                cache.incr(generation_key)
+            logger.info(f"Cache invalidado para atleta {athlete_id}")
         except Exception as e:
-            logger.error(f"Erro ao invalidar cache do usuário {user_id}: {e}")
+            logger.error(f"Erro ao invalidar cache do atleta {athlete_id}: {e}")
@@ -0,0 +1,40 @@
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .profiling import call_attached
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Executor limitado para o trabalho síncrono (pandas, cache, banco) das views assíncronas"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.ASYNC_EXECUTOR_WORKERS),
+                thread_name_prefix="strava-async",
+            )
+        return _executor
+
+
+def _call_and_release(func, *args, **kwargs):
+    try:
+        # Se o request estiver sendo amostrado pelo profiler, esta thread entra na amostragem
+        return call_attached(func, *args, **kwargs)
+    finally:
+        # As threads do executor não pertencem a um request: liberar conexões vencidas
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Executa func no executor limitado sem bloquear o event loop"""
+    return await sync_to_async(
+        functools.partial(_call_and_release, func), thread_sensitive=False, executor=get_executor()
+    )(*args, **kwargs)
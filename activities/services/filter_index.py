@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+EMPTY_POSITIONS = np.array([], dtype=np.intp)
+
+
+class ActivityFilterIndex:
+    """
+    Índice de filtros construído uma vez por conjunto de dados: códigos categóricos de
+    sport_type, semana ISO e mês de cada atividade e, para cada valor, a lista ordenada
+    das posições (iloc) das atividades. Combinar filtros vira interseção de posições.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        sport_types = df["sport_type"].astype("category")
+        self.size = len(df)
+        self.sport_categories = list(sport_types.cat.categories)
+        self.sport_codes = sport_types.cat.codes.to_numpy()
+        self.iso_weeks = df["iso_week"].to_numpy()
+        self.months = df["month"].to_numpy()
+
+        self.by_sport = {
+            self.sport_categories[code]: positions
+            for code, positions in self._group_positions(self.sport_codes).items()
+            if code >= 0
+        }
+        self.by_week = self._group_positions(self.iso_weeks)
+        self.by_month = self._group_positions(self.months)
+
+    @staticmethod
+    def _group_positions(values: np.ndarray) -> dict:
+        """Mapeia cada valor para as posições em que aparece (em ordem crescente)"""
+        order = np.argsort(values, kind="stable")
+        unique_values, starts = np.unique(values[order], return_index=True)
+        return {
+            value.item(): positions
+            for value, positions in zip(unique_values, np.split(order, starts[1:]))
+        }
+
+    def get_positions(self, sport_type: str = None, week: int = None, month: int = None):
+        """
+        Retorna as posições que atendem a todos os filtros informados, ou None quando
+        nenhum filtro foi aplicado (todas as atividades).
+        """
+        groups = []
+        if sport_type:
+            groups.append(self.by_sport.get(sport_type, EMPTY_POSITIONS))
+        if week is not None:
+            groups.append(self.by_week.get(week, EMPTY_POSITIONS))
+        if month is not None:
+            groups.append(self.by_month.get(month, EMPTY_POSITIONS))
+
+        if not groups:
+            return None
+
+        # Começar pelo grupo menor reduz o custo das interseções
+        groups.sort(key=len)
+        positions = groups[0]
+        for group in groups[1:]:
+            positions = np.intersect1d(positions, group, assume_unique=True)
+        return positions
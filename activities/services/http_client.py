@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import threading
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .executor import run_sync
+
+logger = logging.getLogger(__name__)
+
+# Métodos idempotentes que podem ser repetidos automaticamente
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+# Cliente assíncrono do event loop do servidor ASGI (o pool de conexões do httpx pertence ao loop)
+_server_loop = None
+_async_client = None
+_async_client_loop = None
+
+# Cabeçalhos que não valem para o corpo já decodificado pela sessão síncrona
+_DECODED_BODY_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class StravaHTTPSession(requests.Session):
+    """Sessão HTTP com timeout padrão e contagem de requisições"""
+
+    def __init__(self, timeout: tuple):
+        super().__init__()
+        self.default_timeout = timeout
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        with self._count_lock:
+            self.request_count += 1
+        return super().request(method, url, **kwargs)
+
+
+def _build_session() -> StravaHTTPSession:
+    retry = Retry(
+        total=settings.STRAVA_HTTP_MAX_RETRIES,
+        backoff_factor=settings.STRAVA_HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,  # A última resposta é tratada pelo mapeamento de erros dos serviços
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.STRAVA_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.STRAVA_HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = StravaHTTPSession(
+        timeout=(settings.STRAVA_HTTP_CONNECT_TIMEOUT, settings.STRAVA_HTTP_READ_TIMEOUT)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session() -> StravaHTTPSession:
+    """Retorna a sessão HTTP compartilhada pelo processo (pool de conexões com keep-alive)"""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+                logger.info("Sessão HTTP compartilhada criada")
+    return _session
+
+
+def close_http_session():
+    """Fecha a sessão compartilhada e suas conexões"""
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    transport = httpx.AsyncHTTPTransport(
+        # Falhas de conexão; respostas 5xx são repetidas em async_request()
+        retries=settings.STRAVA_HTTP_MAX_RETRIES,
+        limits=httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=settings.STRAVA_HTTP_POOL_MAXSIZE,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.STRAVA_HTTP_READ_TIMEOUT, connect=settings.STRAVA_HTTP_CONNECT_TIMEOUT),
+    )
+
+
+def register_server_loop():
+    """Registra o event loop do servidor ASGI (chamado pela aplicação em strava_stats.asgi)"""
+    global _server_loop
+    _server_loop = asyncio.get_running_loop()
+
+
+def get_async_http_client() -> httpx.AsyncClient | None:
+    """
+    Retorna o cliente assíncrono do servidor ASGI, que vive enquanto o processo e é fechado
+    no shutdown (lifespan). Fora do loop do servidor (views assíncronas sob WSGI rodam cada
+    uma em um loop novo) retorna None.
+    """
+    global _async_client, _async_client_loop
+
+    loop = asyncio.get_running_loop()
+    if loop is not _server_loop:
+        return None
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = _build_async_client()
+        _async_client_loop = loop
+        logger.info("Cliente HTTP assíncrono criado")
+    return _async_client
+
+
+async def close_async_http_client():
+    """Fecha o cliente assíncrono e suas conexões (shutdown do servidor ASGI)"""
+    global _async_client, _async_client_loop
+
+    if _async_client is not None and _async_client_loop is asyncio.get_running_loop():
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+async def _session_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Requisição pela sessão síncrona (pool e novas tentativas próprios), no formato do httpx"""
+    try:
+        response = await run_sync(get_http_session().request, method, url, **kwargs)
+    except requests.Timeout as e:
+        raise httpx.TimeoutException(str(e)) from e
+    except requests.ConnectionError as e:
+        raise httpx.ConnectError(str(e)) from e
+    except requests.RequestException as e:
+        raise httpx.RequestError(str(e)) from e
+
+    headers = {name: value for name, value in response.headers.items() if name.lower() not in _DECODED_BODY_HEADERS}
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=response.content,
+        request=httpx.Request(method, response.url),
+    )
+
+
+async def async_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Requisição assíncrona com as mesmas novas tentativas (5xx com backoff) da sessão síncrona"""
+    client = get_async_http_client()
+    if client is None:
+        # Um cliente por loop descartável não reaproveitaria conexões: usar a sessão compartilhada
+        return await _session_request(method, url, **kwargs)
+
+    retries = settings.STRAVA_HTTP_MAX_RETRIES if method.upper() in RETRY_METHODS else 0
+
+    for attempt in range(retries + 1):
+        response = await client.request(method, url, **kwargs)
+        if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+            return response
+        await asyncio.sleep(settings.STRAVA_HTTP_BACKOFF_FACTOR * (2 ** attempt))
+
+
+def get_pool_stats() -> dict:
+    """Estatísticas do pool de conexões (novas conexões x requisições)"""
+    if _session is None:
+        return {"requests": 0, "connections": 0, "reused": 0, "reuse_rate": 0.0, "pools": []}
+
+    pools = []
+    seen_pool_managers = set()
+    for adapter in _session.adapters.values():
+        pool_manager = adapter.poolmanager
+        if id(pool_manager) in seen_pool_managers:
+            continue
+        seen_pool_managers.add(id(pool_manager))
+
+        for key in pool_manager.pools.keys():
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            pools.append({
+                "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                "requests": pool.num_requests,
+                "connections": pool.num_connections,
+                "idle": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0,
+            })
+
+    total_requests = sum(pool["requests"] for pool in pools)
+    total_connections = sum(pool["connections"] for pool in pools)
+    reused = max(total_requests - total_connections, 0)
+
+    return {
+        "requests": _session.request_count,
+        "connections": total_connections,
+        "reused": reused,
+        "reuse_rate": round(reused / total_requests, 3) if total_requests else 0.0,
+        "pools": pools,
+    }
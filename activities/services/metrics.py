@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+METRIC_PREFIX = "strava_stats"
+
+# Limites (segundos) dos buckets dos histogramas
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS = {
+    "phase_seconds": ("histogram", "Duração das fases instrumentadas (token, Strava, DataFrame, estatísticas, template)"),
+    "request_seconds": ("histogram", "Duração total dos requests por view"),
+    "cache_requests_total": ("counter", "Leituras de cache por resultado (hit, miss, stale)"),
+    "upstream_requests_total": ("counter", "Chamadas à API Strava por endpoint e status"),
+    "serialization_seconds": ("histogram", "Duração da serialização das atividades em cache (encode, decode)"),
+    "serialization_bytes_total": ("counter", "Bytes das atividades serializadas antes (raw) e depois (compressed) do zlib"),
+    "cache_hit_ratio": ("gauge", "Fração das leituras de cache atendidas pelo cache"),
+}
+
+_NULL_CONTEXT = nullcontext()
+
+# Fases do request atual; o dict é compartilhado com as threads de sync_to_async e as tasks filhas
+_request_timings = ContextVar("strava_stats_request_timings", default=None)
+
+
+class _Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Histogramas e contadores agregados do processo, exportados no formato texto do Prometheus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = Counter()
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, value: int = 1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            samples = {}
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                lines = samples.setdefault(name, [])
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(_sample(f"{name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+                lines.append(_sample(f"{name}_bucket", labels + (("le", "+Inf"),), histogram.count))
+                lines.append(_sample(f"{name}_sum", labels, histogram.sum))
+                lines.append(_sample(f"{name}_count", labels, histogram.count))
+
+            for (name, labels), value in sorted(self._counters.items()):
+                samples.setdefault(name, []).append(_sample(name, labels, value))
+
+            for cache_name, (hits, total) in sorted(self._get_cache_totals().items()):
+                samples.setdefault("cache_hit_ratio", []).append(
+                    _sample("cache_hit_ratio", (("cache", cache_name),), round(hits / total, 4))
+                )
+
+        output = []
+        for name, lines in samples.items():
+            metric_type, description = METRICS[name]
+            output.append(f"# HELP {METRIC_PREFIX}_{name} {description}")
+            output.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+            output.extend(lines)
+        return "\n".join(output) + "\n"
+
+    def _get_cache_totals(self) -> dict:
+        totals = {}
+        for (name, labels), value in self._counters.items():
+            if name != "cache_requests_total":
+                continue
+            label_map = dict(labels)
+            hits, total = totals.get(label_map["cache"], (0, 0))
+            totals[label_map["cache"]] = (hits + (value if label_map["result"] == "hit" else 0), total + value)
+        return totals
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name: str, labels: tuple, value) -> str:
+    label_text = ",".join(f'{key}="{_escape_label(label)}"' for key, label in labels)
+    return f"{METRIC_PREFIX}_{name}{{{label_text}}} {_format_value(value)}"
+
+
+registry = MetricsRegistry()
+
+
+def is_enabled() -> bool:
+    return settings.METRICS_ENABLED
+
+
+def start_request():
+    """Começa a coletar as fases do request atual; retorna o token para finish_request"""
+    return _request_timings.set({})
+
+
+def finish_request(token) -> dict:
+    """Encerra a coleta e retorna {fase: segundos} do request"""
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def get_request_timings() -> dict:
+    """Fases já medidas no request atual (vazio fora de um request ou sem métricas)"""
+    return dict(_request_timings.get() or {})
+
+
+def record_phase(phase: str, seconds: float):
+    registry.observe("phase_seconds", seconds, phase=phase)
+    timings = _request_timings.get()
+    if timings is not None:
+        # Fases repetidas no mesmo request (ex.: várias páginas) são somadas
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def _measure(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
+
+
+def timed(phase: str):
+    """Context manager que mede a fase; com as métricas desativadas não faz nada"""
+    if not settings.METRICS_ENABLED:
+        return _NULL_CONTEXT
+    return _measure(phase)
+
+
+def timed_phase(phase: str):
+    """Decorator de timed() para funções síncronas"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.METRICS_ENABLED:
+                return func(*args, **kwargs)
+            with _measure(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_cache(cache_name: str, result: str):
+    """Conta uma leitura de cache: result é hit, miss ou stale"""
+    if settings.METRICS_ENABLED:
+        registry.increment("cache_requests_total", cache=cache_name, result=result)
+
+
+def count_upstream(endpoint: str, status):
+    """Conta uma chamada à API Strava pelo endpoint (sem ids) e status da resposta"""
+    if settings.METRICS_ENABLED:
+        registry.increment("upstream_requests_total", endpoint=endpoint, status=str(status))
+
+
+def count_serialization(operation: str, seconds: float, raw_bytes: int, compressed_bytes: int):
+    """Registra um encode/decode das atividades em cache: a razão raw/compressed é a compressão"""
+    if settings.METRICS_ENABLED:
+        registry.observe("serialization_seconds", seconds, operation=operation)
+        registry.increment("serialization_bytes_total", raw_bytes, operation=operation, stage="raw")
+        registry.increment("serialization_bytes_total", compressed_bytes, operation=operation, stage="compressed")
+
+
+def format_server_timing(timings: dict) -> str:
+    return ", ".join(f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in timings.items())
@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_VERSION = 1
+# Parâmetro de query com que usuários staff pedem o perfil do request (?profile=1)
+TRIGGER_PARAM = "profile"
+
+# Perfil do request atual; lido pelas threads do executor para entrar na amostragem
+_active_profile = ContextVar("strava_stats_active_profile", default=None)
+
+
+@cache
+def _get_path_prefixes() -> tuple:
+    prefixes = {str(settings.BASE_DIR)} | {path for path in sys.path if path}
+    return tuple(sorted((prefix.rstrip(os.sep) + os.sep for prefix in prefixes), key=len, reverse=True))
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _get_path_prefixes():
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+class StackSampler:
+    """
+    Amostra periodicamente as pilhas das threads registradas. Com um frame raiz, só entram
+    as amostras em que a thread está executando abaixo dele (a corrotina do request no
+    event loop, que é compartilhado com os demais requests).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self.ticks = 0
+        self._threads = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add_thread(self, ident: int, root=None) -> bool:
+        with self._lock:
+            if ident in self._threads:
+                return False
+            self._threads[ident] = root
+            return True
+
+    def remove_thread(self, ident: int):
+        with self._lock:
+            self._threads.pop(ident, None)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="strava-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        with self._lock:
+            threads = list(self._threads.items())
+        frames = sys._current_frames()
+        for ident, root in threads:
+            stack = self._get_stack(frames.get(ident), root)
+            if stack:
+                self.stacks[stack] += 1
+        self.ticks += 1
+
+    def _get_stack(self, frame, root) -> str | None:
+        labels = []
+        while frame is not None:
+            labels.append(self._get_label(frame.f_code))
+            if frame is root:
+                break
+            frame = frame.f_back
+        else:
+            if root is not None:
+                # A thread está executando outra coisa (outra corrotina no event loop)
+                return None
+        # Formato "folded" (raiz;...;folha), o mesmo das ferramentas de flame graph
+        return ";".join(reversed(labels))
+
+    def _get_label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+
+class RequestProfile:
+    """Amostragem de um request e os dados anotados durante a execução"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.sampler = StackSampler(settings.PROFILING_INTERVAL)
+        self.annotations = {}
+        self.started = time.perf_counter()
+        self.duration = None
+        self.token = None
+
+
+def is_enabled() -> bool:
+    return settings.PROFILING_ENABLED
+
+
+def get_reason(request, is_staff) -> str | None:
+    """Motivo para amostrar o request (sample ou trigger); is_staff é chamado só se necessário"""
+    if random.random() < settings.PROFILING_SAMPLE_RATE:
+        return "sample"
+    if request.GET.get(TRIGGER_PARAM) == "1" and is_staff():
+        return "trigger"
+    return None
+
+
+def start_profile(reason: str, root) -> RequestProfile:
+    """Começa a amostrar a thread atual abaixo do frame root (e as threads do executor)"""
+    profile = RequestProfile(reason)
+    profile.token = _active_profile.set(profile)
+    profile.sampler.add_thread(threading.get_ident(), root)
+    profile.sampler.start()
+    return profile
+
+
+def finish_profile(profile: RequestProfile):
+    profile.sampler.stop()
+    profile.duration = time.perf_counter() - profile.started
+    _active_profile.reset(profile.token)
+
+
+def call_attached(func, *args, **kwargs):
+    """Executa func incluindo a thread atual na amostragem do request, se houver uma"""
+    profile = _active_profile.get()
+    if profile is None:
+        return func(*args, **kwargs)
+
+    ident = threading.get_ident()
+    if not profile.sampler.add_thread(ident, sys._getframe()):
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.sampler.remove_thread(ident)
+
+
+def annotate(**fields):
+    """Anota dados do request (ex.: tamanho do histórico do atleta) no perfil ativo"""
+    profile = _active_profile.get()
+    if profile is not None:
+        profile.annotations.update(fields)
+
+
+def save_profile(profile: RequestProfile, request, response) -> Path:
+    """Grava o perfil em PROFILING_DIR, apagando os mais antigos além de PROFILING_MAX_FILES"""
+    view = request.resolver_match.url_name if request.resolver_match else None
+    created_at = datetime.now(timezone.utc)
+    data = {
+        "version": PROFILE_VERSION,
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "reason": profile.reason,
+        "method": request.method,
+        "path": request.path,
+        "view": view or "unknown",
+        "status": response.status_code,
+        "duration_ms": round(profile.duration * 1000, 1),
+        "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in metrics.get_request_timings().items()},
+        **profile.annotations,
+        "interval_ms": profile.sampler.interval * 1000,
+        "ticks": profile.sampler.ticks,
+        "stacks": dict(profile.sampler.stacks.most_common()),
+    }
+
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{created_at:%Y%m%dT%H%M%S}-{data['view']}-{secrets.token_hex(4)}.json"
+
+    # Escrita atômica: o profile_summary nunca lê um arquivo pela metade
+    temporary_path = path.with_suffix(".tmp")
+    temporary_path.write_text(json.dumps(data, ensure_ascii=False))
+    os.replace(temporary_path, path)
+
+    _prune(directory, settings.PROFILING_MAX_FILES)
+    logger.info(f"Perfil de {data['view']} ({data['duration_ms']} ms) gravado em {path}")
+    return path
+
+
+def _prune(directory: Path, max_files: int):
+    # Nomes começam pela data: a ordem alfabética é a cronológica
+    for path in sorted(directory.glob("*.json"))[:-max_files or None]:
+        path.unlink(missing_ok=True)
+
+
+def load_profiles(directory, view: str = None, athlete_id: int = None, min_activities: int = 0) -> list:
+    profiles = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            profile = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Perfil ignorado ({path.name}): {e}")
+            continue
+
+        if view and profile.get("view") != view:
+            continue
+        if athlete_id is not None and profile.get("athlete_id") != athlete_id:
+            continue
+        if (profile.get("activities") or 0) < min_activities:
+            continue
+        profiles.append(profile)
+    return profiles
+
+
+def merge_stacks(profiles: list) -> Counter:
+    stacks = Counter()
+    for profile in profiles:
+        stacks.update(profile["stacks"])
+    return stacks
+
+
+def summarize(profiles: list, limit: int = 20, sort: str = "self") -> list:
+    """
+    Funções mais frequentes nas amostras: self conta as amostras em que a função estava
+    executando, total as em que ela estava em qualquer ponto da pilha.
+    """
+    own = Counter()
+    total = Counter()
+    samples = 0
+    for stack, count in merge_stacks(profiles).items():
+        labels = stack.split(";")
+        samples += count
+        own[labels[-1]] += count
+        for label in set(labels):
+            total[label] += count
+
+    ranking = own if sort == "self" else total
+    return [
+        {
+            "function": label,
+            "self": own[label],
+            "total": total[label],
+            "self_pct": round(own[label] / samples * 100, 1),
+            "total_pct": round(total[label] / samples * 100, 1),
+        }
+        for label, _ in ranking.most_common(limit)
+    ]
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..exceptions import StravaRateLimitError
+from .executor import run_sync
+
+logger = logging.getLogger(__name__)
+
+SHORT_WINDOW_SECONDS = 15 * 60
+DAILY_WINDOW_SECONDS = 24 * 3600
+CACHE_PREFIX = "strava_stats:ratelimit"
+
+# Cabeçalhos de leitura (mais restritivos) têm prioridade sobre os gerais
+LIMIT_HEADERS = (
+    ("X-ReadRateLimit-Limit", "X-ReadRateLimit-Usage"),
+    ("X-RateLimit-Limit", "X-RateLimit-Usage"),
+)
+
+
+class StravaRateLimiter:
+    """
+    Controla o orçamento de requisições à API Strava (janela de 15 minutos e diária).
+
+    O uso é compartilhado entre workers através do cache do Django e corrigido a
+    cada resposta com os cabeçalhos X-RateLimit-* enviados pelo Strava.
+    """
+
+    def __init__(self, max_wait: float = None):
+        self.max_wait = settings.STRAVA_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self.reserve = settings.STRAVA_RATE_LIMIT_RESERVE
+
+    @staticmethod
+    def _window_keys(now: float) -> tuple:
+        short_window = int(now // SHORT_WINDOW_SECONDS)
+        day = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%d")
+        return f"{CACHE_PREFIX}:15min:{short_window}", f"{CACHE_PREFIX}:daily:{day}"
+
+    @staticmethod
+    def _seconds_to_next_window(now: float) -> float:
+        return SHORT_WINDOW_SECONDS - (now % SHORT_WINDOW_SECONDS)
+
+    @staticmethod
+    def _get_limits() -> tuple:
+        return cache.get(f"{CACHE_PREFIX}:limits") or (
+            settings.STRAVA_RATE_LIMIT_15MIN,
+            settings.STRAVA_RATE_LIMIT_DAILY,
+        )
+
+    @staticmethod
+    def _increment(key: str, timeout: int) -> int:
+        cache.add(key, 0, timeout=timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Chave expirou entre o add e o incr
+            cache.set(key, 1, timeout=timeout)
+            return 1
+
+    @staticmethod
+    def _raise_to(key: str, usage: int, timeout: int):
+        if usage > (cache.get(key) or 0):
+            cache.set(key, usage, timeout=timeout)
+
+    def get_budget(self) -> dict:
+        """Retorna o uso e os limites atuais das duas janelas"""
+        now = time.time()
+        short_key, daily_key = self._window_keys(now)
+        short_limit, daily_limit = self._get_limits()
+        return {
+            "short_usage": cache.get(short_key) or 0,
+            "short_limit": short_limit,
+            "daily_usage": cache.get(daily_key) or 0,
+            "daily_limit": daily_limit,
+            "seconds_to_reset": round(self._seconds_to_next_window(now), 1),
+        }
+
+    def has_budget(self, requests_needed: int = 1) -> bool:
+        budget = self.get_budget()
+        return (
+            budget["short_usage"] + requests_needed <= budget["short_limit"] - self.reserve
+            and budget["daily_usage"] + requests_needed <= budget["daily_limit"] - self.reserve
+        )
+
+    def acquire(self):
+        """
+        Reserva uma requisição no orçamento compartilhado. Espera a próxima janela de
+        15 minutos quando possível, ou lança StravaRateLimitError.
+        """
+        deadline = time.monotonic() + self.max_wait
+
+        while True:
+            delay, ready = self._get_wait(deadline)
+            if delay:
+                time.sleep(delay)
+            if ready:
+                self._reserve()
+                return
+
+    async def aacquire(self):
+        """Como acquire(), aguardando com asyncio.sleep sem bloquear o event loop"""
+        deadline = time.monotonic() + self.max_wait
+
+        while True:
+            # O cache compartilhado (banco, Redis) é síncrono: consultar fora do event loop
+            delay, ready = await run_sync(self._get_wait, deadline)
+            if delay:
+                await asyncio.sleep(delay)
+            if ready:
+                await run_sync(self._reserve)
+                return
+
+    def _get_wait(self, deadline: float) -> tuple:
+        """Retorna (segundos a aguardar, se a requisição pode ser reservada após a espera)"""
+        now = time.time()
+        short_key, daily_key = self._window_keys(now)
+        short_limit, daily_limit = self._get_limits()
+        short_usage = cache.get(short_key) or 0
+        daily_usage = cache.get(daily_key) or 0
+
+        if daily_usage >= daily_limit - self.reserve:
+            logger.error(f"Limite diário da API Strava atingido ({daily_usage}/{daily_limit})")
+            raise StravaRateLimitError("Limite diário de requisições ao Strava atingido")
+
+        remaining = short_limit - self.reserve - short_usage
+        seconds_left = self._seconds_to_next_window(now)
+
+        if remaining <= 0:
+            if time.monotonic() + seconds_left > deadline:
+                logger.error(f"Limite de 15 minutos da API Strava atingido ({short_usage}/{short_limit})")
+                raise StravaRateLimitError(
+                    f"Limite de requisições ao Strava atingido, tente novamente em {int(seconds_left)}s"
+                )
+            logger.warning(f"Orçamento da API Strava esgotado, aguardando {seconds_left:.1f}s")
+            return seconds_left, False
+
+        # Distribuir o restante do orçamento pelo tempo que falta na janela
+        if remaining < short_limit * settings.STRAVA_RATE_LIMIT_PACING_THRESHOLD:
+            return min(seconds_left / remaining, max(deadline - time.monotonic(), 0)), True
+
+        return 0, True
+
+    def _reserve(self):
+        short_key, daily_key = self._window_keys(time.time())
+        self._increment(short_key, SHORT_WINDOW_SECONDS + 60)
+        self._increment(daily_key, DAILY_WINDOW_SECONDS + 3600)
+
+    def update_from_response(self, response):
+        """Sincroniza limites e uso com os cabeçalhos da resposta do Strava"""
+        for limit_header, usage_header in LIMIT_HEADERS:
+            limit_value = response.headers.get(limit_header)
+            usage_value = response.headers.get(usage_header)
+            if limit_value and usage_value:
+                break
+        else:
+            return
+
+        try:
+            short_limit, daily_limit = (int(value) for value in limit_value.split(",")[:2])
+            short_usage, daily_usage = (int(value) for value in usage_value.split(",")[:2])
+        except ValueError:
+            logger.warning(f"Cabeçalhos de rate limit inválidos: {limit_value} / {usage_value}")
+            return
+
+        now = time.time()
+        short_key, daily_key = self._window_keys(now)
+        cache.set(f"{CACHE_PREFIX}:limits", (short_limit, daily_limit), timeout=DAILY_WINDOW_SECONDS)
+        self._raise_to(short_key, short_usage, SHORT_WINDOW_SECONDS + 60)
+        self._raise_to(daily_key, daily_usage, DAILY_WINDOW_SECONDS + 3600)
+
+    def record_rate_limited(self, response):
+        """Marca a janela atual como esgotada após um 429"""
+        self.update_from_response(response)
+        short_key, _ = self._window_keys(time.time())
+        short_limit, _ = self._get_limits()
+        self._raise_to(short_key, short_limit, SHORT_WINDOW_SECONDS + 60)
@@ -0,0 +1,55 @@
+import json
+import logging
+import time
+import zlib
+
+from django.conf import settings
+
+from ..constants import ACTIVITY_FIELDS
+from .metrics import count_serialization
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def encode_activities(activities: list) -> bytes:
+    """
+    Serializa as atividades em formato colunar compacto (JSON + zlib), mantendo
+    apenas os campos usados pela aplicação (ACTIVITY_FIELDS).
+    """
+    started = time.perf_counter()
+
+    # Campos ausentes em todas as atividades não viram colunas de None
+    fields = [field for field in ACTIVITY_FIELDS if any(field in activity for activity in activities)]
+    document = {
+        "v": FORMAT_VERSION,
+        "fields": fields,
+        "columns": [[activity.get(field) for activity in activities] for field in fields],
+    }
+    raw = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode()
+    payload = zlib.compress(raw, settings.CACHE_COMPRESSION_LEVEL)
+
+    elapsed = time.perf_counter() - started
+    count_serialization("encode", elapsed, len(raw), len(payload))
+    logger.debug(
+        f"{len(activities)} atividades serializadas: {len(raw)} -> {len(payload)} bytes "
+        f"em {elapsed * 1000:.1f}ms"
+    )
+    return payload
+
+
+def decode_activities(payload: bytes) -> list:
+    """Reconstrói a lista de atividades (dicts no formato da API Strava)"""
+    started = time.perf_counter()
+
+    raw = zlib.decompress(payload)
+    document = json.loads(raw)
+    if document.get("v") != FORMAT_VERSION:
+        raise ValueError(f"Versão de serialização desconhecida: {document.get('v')}")
+
+    fields = document["fields"]
+    activities = [dict(zip(fields, row)) for row in zip(*document["columns"])]
+
+    count_serialization("decode", time.perf_counter() - started, len(raw), len(payload))
+    return activities
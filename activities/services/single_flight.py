@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .executor import run_sync
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "strava_stats:singleflight"
+POLL_INTERVAL = 0.2
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas concorrentes com a mesma chave: apenas uma executa a função e
+    as demais aguardam o resultado.
+
+    No mesmo processo os seguidores esperam em um threading.Event e recebem o
+    resultado (ou a exceção) do líder. Entre workers, o líder é quem consegue o lock
+    no cache (cache.add com timeout); os demais aguardam o lock ser liberado e leem o
+    resultado com `poll`. Só o lock fica no cache; o resultado não é gravado nele (ele
+    pode conter segredos, como tokens OAuth), então `poll` deve relê-lo da sua origem.
+
+    A coordenação entre workers exige um cache compartilhado em que add seja atômico
+    (banco, Redis); a verificação activities.E001 recusa backends locais ao processo.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._async_calls = {}
+
+    def _cache_key(self, suffix: str, key: str) -> str:
+        key_hash = hashlib.md5(key.encode()).hexdigest()
+        return f"{CACHE_PREFIX}:{self.name}:{suffix}:{key_hash}"
+
+    def do(self, key: str, fn, poll=None):
+        """Executa fn() uma única vez por chave entre as chamadas concorrentes"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.event.wait(settings.SINGLE_FLIGHT_WAIT_TIMEOUT):
+                logger.warning(f"Tempo esgotado aguardando {self.name} ({key}), executando diretamente")
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_across_workers(key, fn, poll)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def ado(self, key: str, fn, poll=None):
+        """
+        Versão assíncrona de do(): fn é uma função async e os seguidores do mesmo
+        event loop aguardam um asyncio.Future em vez de bloquear uma thread.
+        """
+        call_key = (id(asyncio.get_running_loop()), key)
+        call = self._async_calls.get(call_key)
+
+        if call is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(call), settings.SINGLE_FLIGHT_WAIT_TIMEOUT)
+            except TimeoutError:
+                logger.warning(f"Tempo esgotado aguardando {self.name} ({key}), executando diretamente")
+                return await fn()
+
+        call = self._async_calls[call_key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._ado_across_workers(key, fn, poll)
+            call.set_result(result)
+            return result
+        except Exception as e:
+            call.set_exception(e)
+            call.exception()  # Marcar como consumida mesmo sem seguidores
+            raise
+        finally:
+            self._async_calls.pop(call_key, None)
+            if not call.done():
+                call.cancel()
+
+    def _do_across_workers(self, key: str, fn, poll=None):
+        lock_key = self._cache_key("lock", key)
+        token = uuid.uuid4().hex
+
+        if not cache.add(lock_key, token, timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT):
+            result = self._wait_for_other_worker(lock_key, poll)
+            if result is not None:
+                return result
+            # O outro worker falhou ou demorou demais: executar aqui
+            logger.info(f"{self.name} ({key}) sem resultado de outro worker, executando diretamente")
+            return fn()
+
+        try:
+            return fn()
+        finally:
+            self._release_lock(lock_key, token)
+
+    @staticmethod
+    def _release_lock(lock_key: str, token: str):
+        # Não remover o lock se ele já expirou e pertence a outro worker
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+    async def _ado_across_workers(self, key: str, fn, poll=None):
+        lock_key = self._cache_key("lock", key)
+        token = uuid.uuid4().hex
+
+        # O cache compartilhado (banco, Redis) é síncrono: todas as chamadas fora do event loop
+        if not await run_sync(cache.add, lock_key, token, timeout=settings.SINGLE_FLIGHT_LOCK_TIMEOUT):
+            deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+            logger.info(f"{self.name} em andamento em outro worker, aguardando")
+            while await run_sync(cache.get, lock_key) is not None and time.monotonic() < deadline:
+                await asyncio.sleep(POLL_INTERVAL)
+
+            result = await run_sync(poll) if poll is not None else None
+            if result is not None:
+                return result
+            logger.info(f"{self.name} ({key}) sem resultado de outro worker, executando diretamente")
+            return await fn()
+
+        try:
+            return await fn()
+        finally:
+            await run_sync(self._release_lock, lock_key, token)
+
+    def _wait_for_other_worker(self, lock_key: str, poll=None):
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+        logger.info(f"{self.name} em andamento em outro worker, aguardando")
+
+        while cache.get(lock_key) is not None and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+
+        return poll() if poll is not None else None
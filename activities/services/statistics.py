@@ -1,41 +1,228 @@
+import base64
+import hashlib
 import logging
 import re
-from datetime import date, datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from functools import wraps
 from typing import Optional
 from zoneinfo import ZoneInfo
 
 import pandas as pd
-
-from ..constants import FIRST_DAY_YEAR, TRANSLATE_ACTIVITIES, TRANSLATE_WEEKDAYS
+from django.conf import settings
+
+from ..constants import (
+    ACTIVITY_FIELDS,
+    TRANSLATE_ACTIVITIES,
+    TRANSLATE_WEEKDAYS,
+    get_current_year,
+    get_first_day_year,
+    get_history_years,
+)
+from ..exceptions import InvalidCursorError
+from .activity_store import ActivityStore
 from .cache_service import CacheService
+from .filter_index import ActivityFilterIndex
+from .metrics import count_cache, timed, timed_phase
 
 logger = logging.getLogger(__name__)
 
+# Campos de cada atividade nas listagens do dashboard
+ACTIVITY_LIST_KEYS = [
+    "id", "name", "sport_type", "sport_type_key", "date", "time", "week", "month", "distance",
+    "distance_raw", "elapsed_time", "elapsed_time_seconds", "elevation", "elevation_raw",
+]
+
+# Nomes na ordem de Series.dt.dayofweek (segunda = 0)
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def memoized(stats_type: str):
+    """
+    Memoiza o resultado no cache por atleta, versão dos dados e filtros normalizados.
+    Uma nova versão dos dados gera novas chaves; as antigas expiram sozinhas. Anos
+    passados usam o fingerprint do próprio ano e não expiram.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.use_cache or not self.data_version or self.athlete_id is None:
+                with timed(f"stats.{stats_type}"):
+                    return method(self, *args, **kwargs)
+
+            memo_version, permanent = self._get_memo_version()
+            cache_key = f"{stats_type}:{memo_version}:{self.filters!r}:{args!r}:{sorted(kwargs.items())!r}"
+            cached_result = CacheService.get_stats(self.athlete_id, cache_key)
+            if cached_result is not None:
+                count_cache("stats", "hit")
+                return cached_result
+
+            count_cache("stats", "miss")
+            with timed(f"stats.{stats_type}"):
+                result = method(self, *args, **kwargs)
+            CacheService.set_stats(self.athlete_id, cache_key, result, permanent=permanent)
+            return result
+        return wrapper
+    return decorator
+
+
+@dataclass
+class DashboardStatistics:
+    """Agregados do dashboard calculados sobre as mesmas colunas derivadas"""
+
+    general: dict = field(default_factory=dict)
+    monthly: list = field(default_factory=list)
+    activity_types: list = field(default_factory=list)
+    weekly: list = field(default_factory=list)
+
 
 class StatisticsService:
-    def __init__(self, activities: list, user_id: str = None, use_cache: bool = True):
-        self.user_id = user_id or "default"
+    def __init__(self, activities: list | None, athlete_id: int = None, use_cache: bool = True,
+                 data_version: str = None, year: int = None):
+        """
+        activities None: o frame vem do cache da versão dos dados ou, na falta dele, do
+        armazenamento persistente (só as colunas e o intervalo do histórico).
+        """
+        self.athlete_id = athlete_id
         self.use_cache = use_cache
-        self.df = self._create_dataframe(activities)
+        self.data_version = data_version
+        self.filters = ()
+        self.year = year or get_current_year()
+        # O frame do histórico inteiro fica em cache; o serviço trabalha sobre o ano pedido
+        history = self._load_dataframe(activities)
+        self.history_size = len(history)
+        self.df = self._select_year(history, self.year)
+        self.year_version = self._compute_year_version(self.df, self.year)
+        self._filter_index = None
+
+    def _load_dataframe(self, activities: list | None) -> pd.DataFrame:
+        """Usa o DataFrame tipado em cache para a versão dos dados, se houver"""
+        if not self.data_version or self.athlete_id is None:
+            return self._build_dataframe(activities)
+
+        df = CacheService.get_dataframe(self.athlete_id, self.data_version)
+        if df is None:
+            count_cache("dataframe", "miss")
+            df = self._build_dataframe(activities)
+            CacheService.set_dataframe(self.athlete_id, self.data_version, df)
+        else:
+            count_cache("dataframe", "hit")
+        return df
+
+    def _build_dataframe(self, activities: list | None) -> pd.DataFrame:
+        if activities is None:
+            return self._load_store_dataframe()
+        return self._create_dataframe(activities)
 
+    @timed_phase("create_dataframe")
     def _create_dataframe(self, activities: list) -> pd.DataFrame:
         if not activities:
             return pd.DataFrame()
 
         df = pd.DataFrame.from_dict(activities, orient="columns")
+        return self._prepare_dataframe(df)
+
+    @timed_phase("load_dataframe")
+    def _load_store_dataframe(self) -> pd.DataFrame:
+        """Frame do histórico a partir do armazenamento, sem passar pelo payload em cache"""
+        if self.athlete_id is None:
+            return pd.DataFrame()
+
+        first_year = get_history_years(settings.STRAVA_HISTORY_YEARS)[0]
+        df = ActivityStore.load_dataframe(
+            self.athlete_id,
+            start=get_first_day_year(first_year).replace(tzinfo=timezone.utc),
+            columns=ACTIVITY_FIELDS,
+        )
+        if df.empty:
+            return pd.DataFrame()
+        return self._prepare_dataframe(df)
+
+    @staticmethod
+    def _select_year(df: pd.DataFrame, year: int) -> pd.DataFrame:
+        """Partição do ano dentro do frame do histórico"""
+        if df.empty:
+            return df
+        return df[df["year"] == year]
+
+    @staticmethod
+    def _compute_year_version(df: pd.DataFrame, year: int) -> Optional[str]:
+        """Fingerprint das atividades de um ano passado (None para o ano atual)"""
+        if year >= get_current_year():
+            return None
+        if df.empty:
+            return "empty"
 
-        columns_to_drop = ["type", "resource_state", "athlete"]
-        for col in columns_to_drop:
-            if col in df.columns:
-                df.drop(col, axis=1, inplace=True)
+        columns = [col for col in ACTIVITY_FIELDS if col in df.columns]
+        row_hashes = pd.util.hash_pandas_object(df[columns], index=False)
+        return hashlib.md5(row_hashes.to_numpy().tobytes()).hexdigest()
+
+    def _get_memo_version(self) -> tuple:
+        """
+        Retorna (versão, permanente) das chaves memoizadas. Anos passados não mudam mais:
+        usam o fingerprint do ano e ficam em cache sem expiração, sobrevivendo às novas
+        atividades do ano atual. O ano atual segue a versão do conjunto completo.
+        """
+        if self.year_version is not None:
+            return f"{self.year}:{self.year_version}", True
+        return f"{self.year}:{self.data_version}", False
+
+    @staticmethod
+    def get_available_years() -> list:
+        """Anos do histórico disponíveis para seleção, do mais recente ao mais antigo"""
+        return list(reversed(get_history_years(settings.STRAVA_HISTORY_YEARS)))
+
+    @classmethod
+    def warm_cache(cls, activities: list, athlete_id: int, data_version: str):
+        """Pré-calcula o frame e os agregados sem filtros de uma nova versão dos dados"""
+        for year in cls.get_available_years():
+            # Anos passados já calculados são reaproveitados pelo fingerprint do ano
+            service = cls(activities, athlete_id, data_version=data_version, year=year)
+            service.get_dashboard_statistics()
+            service.get_sport_types()
+            service.filter_index
+
+    @classmethod
+    def _from_frame(cls, df: pd.DataFrame, athlete_id: int, use_cache: bool, data_version: str = None,
+                    filters: tuple = (), year: int = None, year_version: str = None) -> "StatisticsService":
+        """Cria o serviço sobre um DataFrame já processado"""
+        service = cls.__new__(cls)
+        service.athlete_id = athlete_id
+        service.use_cache = use_cache
+        service.data_version = data_version
+        service.filters = filters
+        service.year = year or get_current_year()
+        service.year_version = year_version
+        service.df = df
+        service.history_size = len(df)
+        service._filter_index = None
+        return service
+
+    def _prepare_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Manter apenas as colunas usadas, deixando o frame compacto para o cache
+        df = df[[col for col in ACTIVITY_FIELDS if col in df.columns]]
 
         df["start_date_local"] = pd.to_datetime(df["start_date_local"])
         df["start_date"] = pd.to_datetime(df["start_date"])
 
-        first_day = pd.to_datetime(FIRST_DAY_YEAR, utc=True)
+        first_year = get_history_years(settings.STRAVA_HISTORY_YEARS)[0]
+        first_day = pd.to_datetime(get_first_day_year(first_year), utc=True)
         df = df[df["start_date_local"] > first_day]
 
-        return df
+        return self._add_derived_columns(df)
+
+    @staticmethod
+    def _add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """Colunas derivadas da data, calculadas uma única vez e compartilhadas pelas estatísticas"""
+        start = df["start_date_local"].dt
+        return df.assign(
+            activity_date=start.normalize(),
+            year=start.year.astype("int16"),
+            month=start.month.astype("int8"),
+            iso_week=start.isocalendar().week.astype("int8"),
+            weekday=start.dayofweek.astype("int8"),
+            hour=start.hour.astype("int8"),
+        )
 
     @staticmethod
     def format_time(seconds: float) -> str:
@@ -45,51 +232,71 @@ class StatisticsService:
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
     @staticmethod
-    def get_number_days_year() -> int:
+    def get_number_days_year(year: int = None) -> int:
         timezone = ZoneInfo("America/Sao_Paulo")
         today = datetime.now(timezone).date()
-        first_day = datetime(today.year, 1, 1).replace(tzinfo=timezone).date()
-        return (today - first_day).days + 1
+        year = year or today.year
+        first_day = date(year, 1, 1)
+        # Anos passados contam todos os dias; o atual, até hoje
+        last_day = today if year >= today.year else date(year, 12, 31)
+        return (last_day - first_day).days + 1
+
+    @memoized("dashboard_stats")
+    def get_dashboard_statistics(self) -> DashboardStatistics:
+        """Calcula todos os agregados do dashboard a partir de uma única passada pelo frame"""
+        if self.df.empty:
+            return DashboardStatistics()
+
+        groups = self._group_activities()
+        return DashboardStatistics(
+            general=self._calculate_general_statistics(groups),
+            monthly=self._calculate_monthly_statistics(groups),
+            activity_types=self._calculate_activity_type_statistics(groups),
+            weekly=self._calculate_weekly_statistics(groups),
+        )
 
+    def _group_activities(self) -> pd.DataFrame:
+        """
+        Passada única pelo frame: totais por (dia, esporte), na ordem em que aparecem. Os
+        agregados do dashboard saem desta tabela, bem menor que o frame das atividades.
+        """
+        return (
+            self.df.groupby(["activity_date", "sport_type"], sort=False, dropna=False)
+            .agg(
+                activities=("elapsed_time", "size"),
+                elapsed_time=("elapsed_time", "sum"),
+                distance=("distance", "sum"),
+                total_elevation_gain=("total_elevation_gain", "sum"),
+            )
+            .reset_index()
+        )
+
+    @memoized("general_stats")
     def get_general_statistics(self) -> dict:
         """Obtém estatísticas gerais com cache"""
-        if not self.use_cache:
-            return self._calculate_general_statistics()
+        return self._calculate_general_statistics()
 
-        cache_key = "general_stats"
-        cached_stats = CacheService.get_stats(self.user_id, cache_key)
-        
-        if cached_stats is not None:
-            return cached_stats
-        
-        stats = self._calculate_general_statistics()
-        CacheService.set_stats(self.user_id, cache_key, stats)
-        return stats
-    
-    def _calculate_general_statistics(self) -> dict:
+    def _calculate_general_statistics(self, groups: pd.DataFrame = None) -> dict:
         if self.df.empty:
             return {}
 
-        df = self.df.copy()
-        
-        # Vectorized calculations - mais eficientes
-        total_activities = len(df)
-        total_time_seconds = int(df["elapsed_time"].sum())
-        total_distance_raw = round(df["distance"].sum() / 1000, 1)
-        total_elevation_raw = round(df["total_elevation_gain"].sum(), 1)
-        
-        # Usar value_counts() já otimizado
-        activity_days = len(df["start_date_local"].dt.date.unique())
-        
-        # Vectorized operations para dia e hora mais ativos
-        df["day_of_week"] = df["start_date_local"].dt.day_name()
-        df["hour_of_day"] = df["start_date_local"].dt.hour
-        
-        # Usar idxmax() mais eficiente que sort_values
-        best_week_day = df["day_of_week"].value_counts().idxmax()
-        best_active_hour = df["hour_of_day"].value_counts().idxmax()
-        
-        avg_activity_seconds = df["elapsed_time"].mean()
+        if groups is None:
+            groups = self._group_activities()
+
+        total_activities = int(groups["activities"].sum())
+        total_time_seconds = int(groups["elapsed_time"].sum())
+        total_distance_raw = round(groups["distance"].sum() / 1000, 1)
+        total_elevation_raw = round(groups["total_elevation_gain"].sum(), 1)
+
+        activity_days = groups["activity_date"].nunique()
+
+        # Contagens na ordem de aparição: empates ficam com o primeiro dia/hora do frame
+        weekdays = groups["activity_date"].dt.dayofweek
+        best_week_day = WEEKDAY_NAMES[groups.groupby(weekdays, sort=False)["activities"].sum().idxmax()]
+        # A hora não entra na chave dos grupos (multiplicaria as linhas); contar a coluna int8 é barato
+        best_active_hour = self.df["hour"].value_counts(sort=False).idxmax()
+
+        avg_activity_seconds = total_time_seconds / total_activities
 
         return {
             "total_activities": total_activities,
@@ -99,33 +306,39 @@ class StatisticsService:
             "total_distance_raw": total_distance_raw,
             "total_elevation": f"{total_elevation_raw:.1f}",
             "total_elevation_raw": total_elevation_raw,
-            "activity_days": f"{activity_days}/{self.get_number_days_year()}",
+            "activity_days": f"{activity_days}/{self.get_number_days_year(self.year)}",
             "best_week_day": TRANSLATE_WEEKDAYS.get(best_week_day, best_week_day),
             "best_active_hour": f"{best_active_hour}:00",
             "avg_activity_time": self.format_time(int(avg_activity_seconds)),
         }
 
+    @memoized("monthly_stats")
     def get_monthly_statistics(self) -> list:
+        return self._calculate_monthly_statistics()
+
+    def _calculate_monthly_statistics(self, groups: pd.DataFrame = None) -> list:
         if self.df.empty:
             return []
 
-        df = self.df.copy()
-        df["month_year"] = df["start_date_local"].dt.strftime("%Y-%m")
+        if groups is None:
+            groups = self._group_activities()
 
-        # Vectorized aggregation - mais eficiente
+        dates = groups["activity_date"].dt
         monthly_stats = (
-            df.groupby("month_year")
-            .agg({
-                "elapsed_time": "sum", 
-                "start_date_local": "count", 
-                "distance": "sum"
-            })
+            groups.groupby([dates.year.rename("year"), dates.month.rename("month")])
+            .agg(
+                elapsed_time=("elapsed_time", "sum"),
+                activities=("activities", "sum"),
+                distance=("distance", "sum"),
+            )
             .reset_index()
-            .rename(columns={"start_date_local": "activities"})
         )
 
         # Vectorized operations para evitar loops
-        monthly_stats["month_number"] = monthly_stats["month_year"].str.split("-").str[1].astype(int)
+        monthly_stats["month_year"] = (
+            monthly_stats["year"].astype(str) + "-" + monthly_stats["month"].astype(str).str.zfill(2)
+        )
+        monthly_stats["month_number"] = monthly_stats["month"].astype(int)
         monthly_stats["total_time"] = monthly_stats["elapsed_time"].apply(self.format_time)
         monthly_stats["total_distance"] = (monthly_stats["distance"] / 1000).round(1).astype(str)
 
@@ -136,22 +349,25 @@ class StatisticsService:
 
         return result
 
+    @memoized("activity_type_stats")
     def get_activity_type_statistics(self) -> list:
+        return self._calculate_activity_type_statistics()
+
+    def _calculate_activity_type_statistics(self, groups: pd.DataFrame = None) -> list:
         if self.df.empty:
             return []
 
-        df = self.df.copy()
+        if groups is None:
+            groups = self._group_activities()
 
-        # Agregação única mais eficiente
         activity_stats = (
-            df.groupby("sport_type")
-            .agg({
-                "sport_type": "count",  # count
-                "elapsed_time": "sum",  # sum
-                "distance": "sum",      # sum
-                "total_elevation_gain": "sum"  # sum
-            })
-            .rename(columns={"sport_type": "count"})
+            groups.groupby("sport_type")
+            .agg(
+                count=("activities", "sum"),
+                elapsed_time=("elapsed_time", "sum"),
+                distance=("distance", "sum"),
+                total_elevation_gain=("total_elevation_gain", "sum"),
+            )
             .reset_index()
         )
 
@@ -170,72 +386,72 @@ class StatisticsService:
 
         return result
 
+    @memoized("weekly_stats")
     def get_weekly_statistics(self) -> list:
+        return self._calculate_weekly_statistics()
+
+    def _calculate_weekly_statistics(self, groups: pd.DataFrame = None) -> list:
         if self.df.empty:
             return []
 
-        weeks = self._generate_weeks_dict()
-        result = []
-
-        for week_name, week_dates in weeks.items():
-            start_date = pd.to_datetime(f"{week_dates['start_date']}T00:00:00-00:00")
-            end_date = pd.to_datetime(f"{week_dates['end_date']}T23:59:59-00:00")
-
-            week_df = self.df[
-                (self.df["start_date_local"] >= start_date) &
-                (self.df["start_date_local"] <= end_date)
-            ]
-
-            if not week_df.empty:
-                week_num = int(week_name.replace("Semana ", ""))
-                result.append({
-                    "week": week_name,
-                    "week_number": week_num,
-                    "start_date": week_dates["start_date"],
-                    "end_date": week_dates["end_date"],
-                    "activities": len(week_df),
-                    "total_time": self.format_time(week_df["elapsed_time"].sum()),
-                    "total_distance": f"{week_df['distance'].sum() / 1000:.1f}",
-                })
+        if groups is None:
+            groups = self._group_activities()
 
-        return result
+        first_monday, total_weeks = self._get_weeks_range(self.year)
 
-    def _generate_weeks_dict(self) -> dict:
-        current_year = datetime.now().year
-        d = date(current_year, 1, 1)
-        d += timedelta(days=(7 - d.weekday()) % 7)
+        # Cada dia é atribuído à sua semana uma única vez (semana 1 = primeira segunda-feira do ano)
+        days_since_first_monday = (groups["activity_date"] - pd.Timestamp(first_monday, tz="UTC")).dt.days
+        week_numbers = days_since_first_monday // 7 + 1
+        in_range = (days_since_first_monday >= 0) & (week_numbers <= total_weeks)
 
-        weeks = {}
-        week_num = 1
+        weekly_stats = (
+            groups[in_range]
+            .groupby(week_numbers[in_range].rename("week_number"))
+            .agg(
+                activities=("activities", "sum"),
+                elapsed_time=("elapsed_time", "sum"),
+                distance=("distance", "sum"),
+            )
+        )
 
-        while d.year == current_year:
-            weeks[f"Semana {week_num}"] = {
-                "start_date": str(d),
-                "end_date": str(d + timedelta(days=6)),
-            }
-            d += timedelta(days=7)
-            week_num += 1
+        result = []
+        for week_number, row in zip(weekly_stats.index.tolist(), weekly_stats.itertuples(index=False)):
+            week_start = first_monday + timedelta(weeks=week_number - 1)
+            result.append({
+                "week": f"Semana {week_number}",
+                "week_number": week_number,
+                "start_date": str(week_start),
+                "end_date": str(week_start + timedelta(days=6)),
+                "activities": row.activities,
+                "total_time": self.format_time(row.elapsed_time),
+                "total_distance": f"{row.distance / 1000:.1f}",
+            })
 
-        return weeks
+        return result
 
+    @staticmethod
+    def _get_weeks_range(year: int = None) -> tuple:
+        """Retorna a primeira segunda-feira do ano e o número de semanas que começam no ano"""
+        year = year or get_current_year()
+        first_day = date(year, 1, 1)
+        first_monday = first_day + timedelta(days=(7 - first_day.weekday()) % 7)
+        total_weeks = (date(year, 12, 31) - first_monday).days // 7 + 1
+        return first_monday, total_weeks
+
+    @memoized("activities_by_sport")
     def get_activities_by_sport_type(self, sport_type: str) -> list:
         if self.df.empty:
             return []
 
         filtered_df = self.df[self.df["sport_type"] == sport_type]
 
-        activities = []
-        for _, row in filtered_df.iterrows():
-            activities.append({
-                "name": row.get("name", ""),
-                "date": row["start_date_local"].strftime("%d/%m/%Y %H:%M"),
-                "distance": f"{row.get('distance', 0) / 1000:.2f}",
-                "elapsed_time": self.format_time(row.get("elapsed_time", 0)),
-                "elevation": f"{row.get('total_elevation_gain', 0):.1f}",
-            })
-
-        return activities
+        return self._format_activity_rows(
+            filtered_df,
+            ["name", "date", "distance", "elapsed_time", "elevation"],
+            include_time_in_date=True,
+        )
 
+    @memoized("sport_types")
     def get_sport_types(self) -> list:
         if self.df.empty:
             return []
@@ -252,32 +468,68 @@ class StatisticsService:
         if self.df.empty:
             return []
 
-        df = self.df.copy()
-        original_count = len(df)
-                
-        # Aplicar filtros
-        if sport_filter:
-            df = df[df["sport_type"] == sport_filter]
-        
-        if week_filter:
-            week_number = self._parse_week_filter(week_filter)
-            if week_number is not None:
-                df = df[df["start_date_local"].dt.isocalendar().week == week_number]
-        
+        # Retornar lista de dicionários brutos (dados originais da API)
+        filters = self._normalize_filters(sport_filter, week_filter, month_filter, search_filter)
+        return self._filter_frame(*filters).to_dict("records")
+
+    def filtered(self, sport_filter: str = "", week_filter: str = "",
+                 month_filter: str = "", search_filter: str = "") -> "StatisticsService":
+        """
+        Retorna um serviço sobre o subconjunto filtrado, compartilhando as colunas já
+        processadas deste serviço (sem serializar em dicts nem reprocessar datas).
+        """
+        filters = self._normalize_filters(sport_filter, week_filter, month_filter, search_filter)
+        if self.df.empty or not any(value not in ("", None) for value in filters):
+            # Sem filtros a visão é o próprio conjunto e reaproveita os mesmos resultados em cache
+            return self._from_frame(self.df, self.athlete_id, self.use_cache, self.data_version, self.filters,
+                                    self.year, self.year_version)
+
+        filtered_df = self._filter_frame(*filters)
+        return self._from_frame(filtered_df, self.athlete_id, self.use_cache, self.data_version, filters,
+                                self.year, self.year_version)
+
+    @classmethod
+    def _normalize_filters(cls, sport_filter: str, week_filter: str, month_filter: str,
+                           search_filter: str) -> tuple:
+        """Filtros equivalentes (ex.: "1" e "Semana 1") geram a mesma tupla"""
+        month_number = None
         if month_filter:
             try:
                 month_number = int(month_filter)
             except (TypeError, ValueError):
                 month_number = None
 
-            if month_number is not None:
-                df = df[df["start_date_local"].dt.month == month_number]
-        
+        return (sport_filter or "", cls._parse_week_filter(week_filter), month_number, search_filter or "")
+
+    def _filter_frame(self, sport_type: str, week_number: Optional[int], month_number: Optional[int],
+                      search_filter: str) -> pd.DataFrame:
+        # Esporte, semana e mês resolvidos pelo índice pré-calculado (interseção de posições)
+        positions = self.filter_index.get_positions(
+            sport_type=sport_type or None,
+            week=week_number,
+            month=month_number,
+        )
+        df = self.df if positions is None else self.df.iloc[positions]
+
         if search_filter:
             df = df[df["name"].str.contains(search_filter, case=False, na=False)]
-        
-        # Retornar lista de dicionários brutos (dados originais da API)
-        return df.to_dict("records")
+
+        return df
+
+    @property
+    def filter_index(self) -> ActivityFilterIndex:
+        """Índice de filtros, construído uma vez por versão dos dados e ano"""
+        if self._filter_index is None:
+            # Apenas o conjunto completo (sem filtros) é compartilhado via cache
+            cacheable = bool(self.data_version) and self.athlete_id is not None and not self.filters
+            if cacheable:
+                self._filter_index = CacheService.get_filter_index(self.athlete_id, self._get_memo_version()[0])
+            if self._filter_index is None:
+                with timed("filter_index"):
+                    self._filter_index = ActivityFilterIndex(self.df)
+                if cacheable:
+                    CacheService.set_filter_index(self.athlete_id, self._get_memo_version()[0], self._filter_index)
+        return self._filter_index
 
     @staticmethod
     def _parse_week_filter(week_filter: str) -> Optional[int]:
@@ -310,10 +562,8 @@ class StatisticsService:
                 "has_previous": False
             }
 
-        df = self.df.copy()
-        
         # Ordenar por data (mais recentes primeiro)
-        df = df.sort_values("start_date_local", ascending=False)
+        df = self.df.sort_values("start_date_local", ascending=False)
         
         total_items = len(df)
         total_pages = (total_items + per_page - 1) // per_page  # Ceiling division
@@ -326,24 +576,16 @@ class StatisticsService:
         paginated_df = df.iloc[start_idx:end_idx]
         
         # Converter para formato do template
-        activities = []
-        for _, row in paginated_df.iterrows():
-            activities.append({
-                "name": row.get("name", ""),
-                "sport_type": TRANSLATE_ACTIVITIES.get(row.get("sport_type", ""), row.get("sport_type", "")),
-                "sport_type_key": row.get("sport_type", ""),
-                "date": row["start_date_local"].strftime("%d/%m/%Y"),
-                "time": row["start_date_local"].strftime("%H:%M"),
-                "distance": f"{row.get('distance', 0) / 1000:.1f}",
-                "distance_raw": round(row.get('distance', 0) / 1000, 1),
-                "elapsed_time": self.format_time(row.get("elapsed_time", 0)),
-                "elapsed_time_seconds": int(row.get("elapsed_time", 0)),
-                "elevation": f"{row.get('total_elevation_gain', 0):.0f}",
-                "elevation_raw": round(row.get('total_elevation_gain', 0), 1),
-                "week": row["start_date_local"].isocalendar().week,
-                "month": row["start_date_local"].month,
-            })
-        
+        activities = self._format_activity_rows(
+            paginated_df,
+            [
+                "name", "sport_type", "sport_type_key", "date", "time", "distance", "distance_raw",
+                "elapsed_time", "elapsed_time_seconds", "elevation", "elevation_raw", "week", "month",
+            ],
+            distance_decimals=1,
+            elevation_decimals=0,
+        )
+
         return {
             "activities": activities,
             "current_page": page,
@@ -358,32 +600,104 @@ class StatisticsService:
         if self.df.empty:
             return []
 
-        activities = []
         sorted_df = self.df.sort_values("start_date_local", ascending=False)
 
-        for _, row in sorted_df.iterrows():
-            sport_type = row.get("sport_type", "")
-            activity_date = row["start_date_local"]
-            week_number = activity_date.isocalendar()[1]
-            month_number = activity_date.month
-            distance_km = row.get('distance', 0) / 1000
-            elapsed_seconds = row.get("elapsed_time", 0)
-            elevation_m = row.get('total_elevation_gain', 0)
-            activities.append({
-                "id": row.get("id", ""),
-                "name": row.get("name", ""),
-                "sport_type": TRANSLATE_ACTIVITIES.get(sport_type, sport_type),
-                "sport_type_key": sport_type,
-                "date": activity_date.strftime("%d/%m/%Y"),
-                "time": activity_date.strftime("%H:%M"),
-                "week": week_number,
-                "month": month_number,
-                "distance": f"{distance_km:.2f}",
-                "distance_raw": round(distance_km, 2),
-                "elapsed_time": self.format_time(elapsed_seconds),
-                "elapsed_time_seconds": int(elapsed_seconds),
-                "elevation": f"{elevation_m:.1f}",
-                "elevation_raw": round(elevation_m, 1),
-            })
+        return self._format_activity_rows(sorted_df, ACTIVITY_LIST_KEYS)
 
-        return activities
+    @memoized("activities_page")
+    def get_activities_page(self, cursor: str = None, per_page: int = 50) -> dict:
+        """
+        Página de atividades com paginação por cursor (keyset), da mais recente para a
+        mais antiga. O cursor aponta para (start_date_local, id) da última atividade
+        entregue, então páginas seguintes não dependem de offset.
+        """
+        if self.df.empty:
+            return {"activities": [], "next_cursor": None, "has_next": False, "total_items": 0, "per_page": per_page}
+
+        df = self.df.sort_values(["start_date_local", "id"], ascending=False)
+        total_items = len(df)
+
+        if cursor:
+            cursor_date, cursor_id = self._decode_cursor(cursor)
+            dates = df["start_date_local"]
+            df = df[(dates < cursor_date) | ((dates == cursor_date) & (df["id"] < cursor_id))]
+
+        page_df = df.iloc[:per_page]
+        has_next = len(df) > per_page
+        next_cursor = None
+        if has_next:
+            last_row = page_df.iloc[-1]
+            next_cursor = self._encode_cursor(last_row["start_date_local"], last_row["id"])
+
+        return {
+            # Mesma formatação da tabela paginada do dashboard
+            "activities": self._format_activity_rows(
+                page_df, ACTIVITY_LIST_KEYS, distance_decimals=1, elevation_decimals=0
+            ),
+            "next_cursor": next_cursor,
+            "has_next": has_next,
+            "total_items": total_items,
+            "per_page": per_page,
+        }
+
+    @staticmethod
+    def _encode_cursor(start_date: pd.Timestamp, activity_id: int) -> str:
+        raw = f"{start_date.isoformat()}|{int(activity_id)}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple:
+        """Decodifica o cursor; lança InvalidCursorError se for inválido"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            start_date, activity_id = raw.rsplit("|", 1)
+            return pd.Timestamp(start_date), int(activity_id)
+        except Exception as e:
+            raise InvalidCursorError("Cursor inválido") from e
+
+    def _format_activity_rows(self, df: pd.DataFrame, keys: list, distance_decimals: int = 2,
+                              elevation_decimals: int = 1, include_time_in_date: bool = False) -> list:
+        """
+        Monta as colunas de exibição de uma vez para todas as linhas e converte em
+        registros, evitando iterrows e formatação linha a linha.
+        """
+        if df.empty:
+            return []
+
+        # Um único strftime por linha; data e hora são recortadas do mesmo texto
+        datetime_text = df["start_date_local"].dt.strftime("%d/%m/%Y %H:%M")
+        distance_km = df["distance"] / 1000
+        formatters = {
+            "id": lambda: df["id"],
+            "name": lambda: df["name"].fillna(""),
+            "sport_type": lambda: df["sport_type"].map(TRANSLATE_ACTIVITIES).fillna(df["sport_type"]),
+            "sport_type_key": lambda: df["sport_type"],
+            "date": lambda: datetime_text if include_time_in_date else datetime_text.str[:10],
+            "time": lambda: datetime_text.str[11:],
+            "week": lambda: df["iso_week"],
+            "month": lambda: df["month"],
+            "distance": lambda: self._format_decimals(distance_km, distance_decimals),
+            # Arredondamento via texto para coincidir com round() do Python (Series.round difere em empates)
+            "distance_raw": lambda: self._format_decimals(distance_km, distance_decimals).astype(float),
+            "elapsed_time": lambda: self.format_time_series(df["elapsed_time"]),
+            "elapsed_time_seconds": lambda: df["elapsed_time"],
+            "elevation": lambda: self._format_decimals(df["total_elevation_gain"], elevation_decimals),
+            "elevation_raw": lambda: self._format_decimals(df["total_elevation_gain"], 1).astype(float),
+        }
+
+        # tolist() já devolve tipos nativos do Python; montar os registros é um zip por coluna
+        columns = [formatters[key]().tolist() for key in keys]
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+
+    @staticmethod
+    def _format_decimals(values: pd.Series, decimals: int) -> pd.Series:
+        return values.map(f"{{:.{decimals}f}}".format)
+
+    @staticmethod
+    def format_time_series(seconds: pd.Series) -> pd.Series:
+        """Versão vetorizada de format_time (HH:MM:SS) para uma coluna inteira"""
+        total_seconds = seconds.fillna(0).astype("int64")
+        hours = (total_seconds // 3600).astype(str).str.zfill(2)
+        minutes = (total_seconds % 3600 // 60).astype(str).str.zfill(2)
+        secs = (total_seconds % 60).astype(str).str.zfill(2)
+        return hours + ":" + minutes + ":" + secs
@@ -1,46 +1,420 @@
-import requests
+import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import httpx
+import requests
 from django.conf import settings
+from django.db import connections
 
-from ..constants import EPOCH_TIMESTAMP, QUANTITY_PER_PAGE
-from ..exceptions import StravaAPIError, StravaAuthenticationError, StravaRateLimitError, StravaTokenExpiredError
+from ..constants import (
+    MAX_PAGES,
+    QUANTITY_PER_PAGE,
+    get_history_years,
+    get_year_timestamp,
+)
+from ..exceptions import StravaAPIError, StravaTokenExpiredError
+from .activity_store import ActivityStore
 from .cache_service import CacheService
+from .executor import run_sync
+from .http_client import async_request, get_http_session, get_pool_stats
+from .metrics import count_cache, count_upstream, timed
+from .rate_limiter import StravaRateLimiter
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+_activities_flight = SingleFlight("activities")
+
+# Atualizações em segundo plano (stale-while-revalidate), limitadas e sem duplicatas por atleta
+_refresh_executor = None
+_refresh_executor_lock = threading.Lock()
+_pending_refreshes = set()
+_pending_refreshes_lock = threading.Lock()
+
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.CACHE_REFRESH_WORKERS),
+                thread_name_prefix="strava-refresh",
+            )
+        return _refresh_executor
+
+
+def _run_background_refresh(access_token: str, athlete_id: int, after_timestamp: float, refresh_key: str):
+    """Atualiza as atividades vencidas e pré-calcula as estatísticas da nova versão"""
+    try:
+        api_service = StravaAPIService(access_token, athlete_id, max_wait=settings.STRAVA_RATE_LIMIT_BACKGROUND_MAX_WAIT)
+        activities = api_service._refresh_activities(after_timestamp)
+        if activities and api_service.data_version:
+            # Import tardio: statistics depende dos mesmos serviços de cache
+            from .statistics import StatisticsService
+            StatisticsService.warm_cache(activities, athlete_id, api_service.data_version)
+        logger.info(f"Atividades do atleta {athlete_id} atualizadas em segundo plano")
+    except Exception as e:
+        logger.error(f"Erro na atualização em segundo plano do atleta {athlete_id}: {e}")
+    finally:
+        with _pending_refreshes_lock:
+            _pending_refreshes.discard(refresh_key)
+        # A thread não pertence a um request: liberar a conexão com o banco
+        connections.close_all()
+
+
+def _parse_response(response, endpoint: str, description: str, allow_missing: bool = False):
+    """Contabiliza a resposta e retorna o JSON, mapeando os erros; com allow_missing o 404 vira None"""
+    count_upstream(endpoint, response.status_code)
+    if response.status_code == 401:
+        raise StravaTokenExpiredError("Token de acesso expirado ou inválido")
+    elif allow_missing and response.status_code == 404:
+        return None
+    elif response.status_code != 200:
+        raise StravaAPIError(f"Erro ao obter {description}: {response.status_code}", response.status_code)
+    return response.json()
+
+
+def _check_page_response(response) -> bool:
+    """Mapeia o status de uma página de atividades para exceções Strava; False no 429 (repetir)"""
+    count_upstream("athlete/activities", response.status_code)
+
+    if response.status_code == 401:
+        logger.error("Token expirado ou inválido")
+        raise StravaTokenExpiredError("Token de acesso expirado ou inválido")
+    elif response.status_code == 429:
+        # O próximo acquire() aguarda a nova janela ou desiste com StravaRateLimitError
+        logger.warning("Rate limit atingido, aguardando...")
+        return False
+    elif response.status_code >= 400:
+        error_msg = f"Erro na API: {response.status_code} - {response.text}"
+        logger.error(error_msg)
+        raise StravaAPIError(error_msg, response.status_code)
+    elif response.status_code != 200:
+        logger.error(f"Erro inesperado na API: {response.status_code}")
+        raise StravaAPIError("Erro inesperado na API Strava", response.status_code)
+    return True
+
+
+def _map_request_error(error: Exception) -> StravaAPIError:
+    """Converte falhas de transporte (requests ou httpx) e de JSON em StravaAPIError"""
+    if isinstance(error, (requests.exceptions.Timeout, httpx.TimeoutException)):
+        logger.error(f"Timeout na requisição: {error}")
+        return StravaAPIError("Timeout na comunicação com API Strava")
+    elif isinstance(error, (requests.exceptions.ConnectionError, httpx.TransportError)):
+        logger.error(f"Erro de conexão: {error}")
+        return StravaAPIError("Falha na conexão com API Strava")
+    elif isinstance(error, (requests.exceptions.RequestException, httpx.HTTPError)):
+        logger.error(f"Erro de requisição: {error}")
+        return StravaAPIError(f"Erro na comunicação com API Strava: {str(error)}")
+    elif isinstance(error, ValueError):
+        logger.error(f"Erro ao processar JSON: {error}")
+        return StravaAPIError("Resposta inválida da API Strava")
+    logger.error(f"Erro inesperado: {error}")
+    return StravaAPIError(f"Erro inesperado: {str(error)}")
+
+
+class _PageBatches:
+    """
+    Controle da busca especulativa de páginas em lotes, comum às versões síncrona e
+    assíncrona: cada lote é buscado em paralelo e as páginas são registradas em ordem.
+    """
+
+    def __init__(self):
+        self.concurrency = max(1, settings.STRAVA_FETCH_CONCURRENCY)
+        self.activities = []
+        self.page = 1
+        self.batch_size = 1
+        self.finished = False
+
+    def next_batch(self) -> range | None:
+        """Próximo lote de páginas a buscar; None ao terminar"""
+        if self.finished:
+            return None
+        if self.page > MAX_PAGES:
+            # Limitar para evitar loops infinitos
+            logger.warning("Limite máximo de páginas atingido")
+            return None
+
+        batch = range(self.page, min(self.page + self.batch_size, MAX_PAGES + 1))
+        self.page = batch[-1] + 1
+        return batch
+
+    def add(self, activities: list) -> bool:
+        """Registra uma página; False quando ela está vazia e encerra a busca"""
+        if not activities:
+            self.finished = True
+            return False
+
+        self.activities.extend(activities)
+        # Página incompleta indica o fim: confirmar com uma única requisição
+        self.batch_size = self.concurrency if len(activities) == QUANTITY_PER_PAGE else 1
+        return True
+
 
 class StravaAPIService:
-    def __init__(self, access_token: str, user_id: str = None):
+    def __init__(self, access_token: str, athlete_id: int = None, max_wait: float = None):
+        """max_wait: espera máxima por orçamento da API (padrão: STRAVA_RATE_LIMIT_MAX_WAIT, para requests web)"""
         self.access_token = access_token
-        self.user_id = user_id or "default"
+        self.athlete_id = athlete_id
+        self.rate_limiter = StravaRateLimiter(max_wait)
+        self.data_version = None
         self.base_url = settings.STRAVA_API_BASE_URL
         self.headers = {"Authorization": f"Bearer {access_token}"}
 
+    @staticmethod
+    def get_history_start() -> float:
+        """Início do histórico sincronizado: 1º de janeiro do ano mais antigo"""
+        return get_year_timestamp(get_history_years(settings.STRAVA_HISTORY_YEARS)[0])
+
     def get_athlete(self) -> dict:
-        response = requests.get(f"{self.base_url}/athlete", headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        self.rate_limiter.acquire()
+        response = get_http_session().get(f"{self.base_url}/athlete", headers=self.headers)
+        self.rate_limiter.update_from_response(response)
+        return _parse_response(response, "athlete", "atleta")
+
+    def get_activity(self, activity_id: int) -> dict | None:
+        """Obtém uma atividade; None se ela não existir (ou não for visível ao token)"""
+        self.rate_limiter.acquire()
+        response = get_http_session().get(f"{self.base_url}/activities/{activity_id}", headers=self.headers)
+        self.rate_limiter.update_from_response(response)
+        return _parse_response(response, "activities/{id}", "atividade", allow_missing=True)
 
     def get_all_activities(self, after_timestamp: float = None, force_refresh: bool = False) -> list:
-        """Obtém todas as atividades com cache"""
+        """Obtém todas as atividades com cache e sincronização incremental"""
         if after_timestamp is None:
-            after_timestamp = EPOCH_TIMESTAMP
+            after_timestamp = self.get_history_start()
+
+        if self.athlete_id is None:
+            # O cache é separado pelo id do atleta no Strava
+            self.athlete_id = self.get_athlete()["id"]
 
         # Tentar obter do cache primeiro
         if not force_refresh:
-            cached_activities = CacheService.get_activities(self.user_id, self.access_token)
-            if cached_activities is not None:
+            entry = CacheService.get_activities_entry(self.athlete_id)
+            if entry is not None:
+                cached_activities, stale = entry
+                count_cache("activities", "stale" if stale else "hit")
+                self.data_version = self._get_data_version(cached_activities)
+                if stale:
+                    # Servir os dados vencidos agora e atualizar em segundo plano
+                    self._schedule_refresh(after_timestamp)
                 return cached_activities
+            count_cache("activities", "miss")
+
+        return self._refresh_activities(after_timestamp)
+
+    def ensure_activities(self, after_timestamp: float = None) -> list | None:
+        """
+        Garante as atividades em cache (atualizando como get_all_activities) e define
+        data_version sem decodificar o payload. Retorna as atividades só quando acabaram de
+        ser buscadas; com o cache válido retorna None e o DataFrame vem do cache ou do banco.
+        """
+        if after_timestamp is None:
+            after_timestamp = self.get_history_start()
+
+        if self.athlete_id is None:
+            self.athlete_id = self.get_athlete()["id"]
+
+        status = CacheService.get_activities_status(self.athlete_id)
+        if status is not None:
+            self.data_version, stale = status
+            count_cache("activities", "stale" if stale else "hit")
+            if stale:
+                self._schedule_refresh(after_timestamp)
+            return None
+        count_cache("activities", "miss")
+
+        return self._refresh_activities(after_timestamp)
+
+    def _refresh_activities(self, after_timestamp: float) -> list:
+        # Uma única busca por atleta; requisições concorrentes aguardam o resultado dela
+        all_activities, self.data_version = _activities_flight.do(
+            f"{self.athlete_id}:{after_timestamp}",
+            lambda: self._sync_activities(after_timestamp),
+            poll=self._get_fresh_cached_activities,
+        )
+        return all_activities
+
+    def _get_data_version(self, activities: list) -> str:
+        return (
+            CacheService.get_activities_version(self.athlete_id)
+            or CacheService.compute_data_version(activities)
+        )
+
+    def _get_fresh_cached_activities(self) -> tuple | None:
+        """Retorna (atividades, versão dos dados) do cache, ignorando entradas com o TTL suave vencido"""
+        entry = CacheService.get_activities_entry(self.athlete_id)
+        if entry is None or entry[1]:
+            return None
+        return entry[0], self._get_data_version(entry[0])
+
+    def _schedule_refresh(self, after_timestamp: float):
+        """Agenda a atualização das atividades (uma por atleta) no executor de segundo plano"""
+        refresh_key = f"{self.athlete_id}:{after_timestamp}"
+        with _pending_refreshes_lock:
+            if refresh_key in _pending_refreshes:
+                return
+            _pending_refreshes.add(refresh_key)
+
+        try:
+            _get_refresh_executor().submit(
+                _run_background_refresh, self.access_token, self.athlete_id, after_timestamp, refresh_key
+            )
+        except RuntimeError as e:
+            # Executor encerrado (desligamento do processo)
+            logger.warning(f"Não foi possível agendar atualização em segundo plano: {e}")
+            with _pending_refreshes_lock:
+                _pending_refreshes.discard(refresh_key)
+
+    def _sync_activities(self, after_timestamp: float) -> tuple:
+        """Busca (incremental ou completa) e retorna (atividades, versão dos dados)"""
+        with timed("strava_sync"):
+            sync_state, window_start = self._prepare_sync(after_timestamp)
+            fetched_activities = self._fetch_activities(window_start)
+        logger.info(f"Pool HTTP: {get_pool_stats()}")
+        return self._complete_sync(after_timestamp, sync_state, window_start, fetched_activities)
+
+    def _prepare_sync(self, after_timestamp: float) -> tuple:
+        """Retorna (estado salvo, início da janela a buscar); sem estado a busca é completa"""
+        sync_state = CacheService.get_sync_state(self.athlete_id)
+        if sync_state is None:
+            # Retomar a partir do armazenamento persistente (reinício/eviction do cache)
+            sync_state = self._get_stored_sync_state(after_timestamp)
+
+        if self._can_sync_incrementally(sync_state, after_timestamp):
+            stored_activities = self._get_stored_activities(after_timestamp)
+            if stored_activities is not None:
+                # Buscar apenas atividades após o watermark e mesclar com o conjunto salvo
+                window_start = max(sync_state["watermark"] - settings.STRAVA_SYNC_LOOKBACK_SECONDS, after_timestamp)
+                logger.info(f"Sincronização incremental de atividades após {window_start}")
+                return {**sync_state, "activities": stored_activities}, window_start
 
         # Buscar da API se não estiver em cache
         logger.info("Buscando atividades da API Strava")
-        all_activities = []
-        page = 1
-        has_error = False
+        return None, after_timestamp
+
+    def _complete_sync(self, after_timestamp: float, sync_state: dict | None, window_start: float,
+                       fetched_activities: list) -> tuple:
+        """Mescla as atividades buscadas, grava no armazenamento e no cache"""
+        data_version = None
+
+        if sync_state is not None:
+            all_activities = self._merge_activities(sync_state["activities"], fetched_activities, window_start)
+            last_full_sync = sync_state["last_full_sync"]
+            self._write_through(fetched_activities, window_start, full_sync=False)
+        else:
+            all_activities = fetched_activities
+            last_full_sync = time.time()
+            self._write_through(all_activities, after_timestamp, full_sync=True)
+
+        if all_activities:
+            data_version = CacheService.set_activities(self.athlete_id, all_activities)
+            CacheService.set_sync_state(self.athlete_id, {
+                "after_timestamp": after_timestamp,
+                "watermark": self._get_watermark(all_activities, after_timestamp),
+                "last_full_sync": last_full_sync,
+            })
+
+        return all_activities, data_version
+
+    def _get_stored_sync_state(self, after_timestamp: float) -> dict | None:
+        try:
+            return ActivityStore.get_sync_state(self.athlete_id, after_timestamp)
+        except Exception as e:
+            logger.error(f"Erro ao ler estado de sincronização armazenado: {e}")
+            return None
+
+    def _get_stored_activities(self, after_timestamp: float) -> list | None:
+        """Conjunto já sincronizado: a entrada de atividades em cache ou, sem ela, o banco"""
+        cached_activities = CacheService.get_activities(self.athlete_id)
+        if cached_activities is not None:
+            return cached_activities
+
+        try:
+            return ActivityStore.get_activities(self.athlete_id, after_timestamp)
+        except Exception as e:
+            logger.error(f"Erro ao ler atividades armazenadas: {e}")
+            return None
+
+    def _write_through(self, activities: list, window_start: float, full_sync: bool):
+        """Grava as atividades buscadas no armazenamento persistente"""
+        if not self.athlete_id:
+            return
+
+        try:
+            ActivityStore.sync_activities(self.athlete_id, activities, window_start, full_sync=full_sync)
+        except Exception as e:
+            logger.error(f"Erro ao gravar atividades no armazenamento: {e}")
 
+    @staticmethod
+    def _can_sync_incrementally(sync_state: dict | None, after_timestamp: float) -> bool:
+        """Verifica se o estado salvo permite sincronizar apenas o delta"""
+        if not sync_state:
+            return False
+
+        # O estado precisa cobrir o mesmo intervalo solicitado
+        if sync_state.get("after_timestamp") != after_timestamp:
+            return False
+
+        # Reconciliação completa periódica para capturar edições e exclusões
+        return time.time() - sync_state.get("last_full_sync", 0) < settings.STRAVA_FULL_SYNC_INTERVAL
+
+    @staticmethod
+    def _get_activity_timestamp(activity: dict) -> float:
+        return datetime.fromisoformat(activity["start_date"].replace("Z", "+00:00")).timestamp()
+
+    @classmethod
+    def _get_watermark(cls, activities: list, default: float) -> float:
+        """Retorna o start_date (epoch) da atividade mais recente"""
+        return max((cls._get_activity_timestamp(activity) for activity in activities), default=default)
+
+    @classmethod
+    def _merge_activities(cls, stored_activities: list, new_activities: list, window_start: float) -> list:
+        """
+        Mescla o delta com o conjunto salvo. As atividades da janela sincronizada são
+        substituídas pelo retorno da API, o que também remove as excluídas nessa janela.
+        """
+        merged = {
+            activity["id"]: activity
+            for activity in stored_activities
+            if cls._get_activity_timestamp(activity) <= window_start
+        }
+        for activity in new_activities:
+            merged[activity["id"]] = activity
+
+        return sorted(merged.values(), key=cls._get_activity_timestamp)
+
+    def _fetch_activities(self, after_timestamp: float) -> list:
+        """Busca todas as páginas de atividades após o timestamp informado"""
+        pages = _PageBatches()
+
+        with ThreadPoolExecutor(max_workers=pages.concurrency, thread_name_prefix="strava-fetch") as executor:
+            while True:
+                batch = pages.next_batch()
+                if batch is None:
+                    return pages.activities
+
+                futures = [executor.submit(self._fetch_page, after_timestamp, batch_page) for batch_page in batch]
+                try:
+                    for future in futures:
+                        if not pages.add(future.result()):
+                            break
+                finally:
+                    # Página vazia ou com erro: descartar as especulativas que ainda não começaram
+                    # (sem isso, a saída do executor as executaria antes de propagar o erro)
+                    for pending in futures:
+                        pending.cancel()
+
+    def _fetch_page(self, after_timestamp: float, page: int) -> list:
+        """Busca uma página de atividades, mapeando falhas para exceções Strava"""
         while True:
             try:
-                response = requests.get(
+                self.rate_limiter.acquire()
+                response = get_http_session().get(
                     f"{self.base_url}/athlete/activities",
                     headers=self.headers,
                     params={
@@ -48,60 +422,138 @@ class StravaAPIService:
                         "page": page,
                         "per_page": QUANTITY_PER_PAGE,
                     },
-                    timeout=30,  # Timeout de 30 segundos
                 )
+                self.rate_limiter.update_from_response(response)
 
-                if response.status_code == 401:
-                    logger.error("Token expirado ou inválido")
-                    raise StravaTokenExpiredError("Token de acesso expirado ou inválido")
-                elif response.status_code == 429:
-                    logger.warning("Rate limit atingido, aguardando...")
-                    import time
-                    time.sleep(2)  # Esperar 2 segundos
+                if not _check_page_response(response):
+                    self.rate_limiter.record_rate_limited(response)
                     continue
-                elif response.status_code >= 400:
-                    error_msg = f"Erro na API: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    raise StravaAPIError(error_msg, response.status_code)
-                elif response.status_code != 200:
-                    logger.error(f"Erro inesperado na API: {response.status_code}")
-                    raise StravaAPIError(f"Erro inesperado na API Strava", response.status_code)
-
-                activities = response.json()
-                if not activities:
-                    break
+                return response.json()
 
-                all_activities.extend(activities)
-                page += 1
+            except StravaAPIError:
+                raise
+            except Exception as e:
+                raise _map_request_error(e)
 
-                # Limitar para evitar loops infinitos
-                if page > 100:  # Máximo de 10.000 atividades
-                    logger.warning("Limite máximo de páginas atingido")
-                    break
 
-            except requests.exceptions.Timeout as e:
-                logger.error(f"Timeout na requisição: {e}")
-                raise StravaAPIError("Timeout na comunicação com API Strava")
-            except requests.exceptions.ConnectionError as e:
-                logger.error(f"Erro de conexão: {e}")
-                raise StravaAPIError("Falha na conexão com API Strava")
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Erro de requisição: {e}")
-                raise StravaAPIError(f"Erro na comunicação com API Strava: {str(e)}")
-            except ValueError as e:
-                logger.error(f"Erro ao processar JSON: {e}")
-                raise StravaAPIError("Resposta inválida da API Strava")
-            except Exception as e:
-                logger.error(f"Erro inesperado: {e}")
-                raise StravaAPIError(f"Erro inesperado: {str(e)}")
-
-        # Armazenar no cache apenas se não houver erros
-        if not has_error and all_activities:
-            CacheService.set_activities(self.user_id, self.access_token, all_activities)
-        elif has_error and not all_activities:
-            # Tentar usar cache antigo como fallback
-            cached_activities = CacheService.get_activities(self.user_id, self.access_token)
-            if cached_activities:
+class AsyncStravaAPIService(StravaAPIService):
+    """
+    Cliente assíncrono (httpx) com a mesma interface e o mesmo mapeamento de erros do
+    StravaAPIService. Só a espera pela API Strava fica no event loop; cache, banco e
+    mesclagem rodam no executor limitado.
+    """
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        await self.rate_limiter.aacquire()
+        response = await async_request("GET", url, headers=self.headers, **kwargs)
+        await run_sync(self.rate_limiter.update_from_response, response)
+        return response
+
+    async def get_athlete(self) -> dict:
+        response = await self._get(f"{self.base_url}/athlete")
+        return _parse_response(response, "athlete", "atleta")
+
+    async def get_activity(self, activity_id: int) -> dict | None:
+        """Obtém uma atividade; None se ela não existir (ou não for visível ao token)"""
+        response = await self._get(f"{self.base_url}/activities/{activity_id}")
+        return _parse_response(response, "activities/{id}", "atividade", allow_missing=True)
+
+    async def get_all_activities(self, after_timestamp: float = None, force_refresh: bool = False) -> list:
+        """Obtém todas as atividades com cache e sincronização incremental"""
+        if after_timestamp is None:
+            after_timestamp = self.get_history_start()
+
+        if self.athlete_id is None:
+            self.athlete_id = (await self.get_athlete())["id"]
+
+        if not force_refresh:
+            entry = await run_sync(CacheService.get_activities_entry, self.athlete_id)
+            if entry is not None:
+                cached_activities, stale = entry
+                count_cache("activities", "stale" if stale else "hit")
+                self.data_version = await run_sync(self._get_data_version, cached_activities)
+                if stale:
+                    self._schedule_refresh(after_timestamp)
                 return cached_activities
+            count_cache("activities", "miss")
+
+        return await self._refresh_activities(after_timestamp)
+
+    async def ensure_activities(self, after_timestamp: float = None) -> list | None:
+        """Versão assíncrona de StravaAPIService.ensure_activities"""
+        if after_timestamp is None:
+            after_timestamp = self.get_history_start()
 
+        if self.athlete_id is None:
+            self.athlete_id = (await self.get_athlete())["id"]
+
+        status = await run_sync(CacheService.get_activities_status, self.athlete_id)
+        if status is not None:
+            self.data_version, stale = status
+            count_cache("activities", "stale" if stale else "hit")
+            if stale:
+                self._schedule_refresh(after_timestamp)
+            return None
+        count_cache("activities", "miss")
+
+        return await self._refresh_activities(after_timestamp)
+
+    async def _refresh_activities(self, after_timestamp: float) -> list:
+        # Mesma chave (e mesmo lock entre workers) da versão síncrona
+        all_activities, self.data_version = await _activities_flight.ado(
+            f"{self.athlete_id}:{after_timestamp}",
+            lambda: self._sync_activities(after_timestamp),
+            poll=self._get_fresh_cached_activities,
+        )
         return all_activities
+
+    async def _sync_activities(self, after_timestamp: float) -> tuple:
+        with timed("strava_sync"):
+            sync_state, window_start = await run_sync(self._prepare_sync, after_timestamp)
+            fetched_activities = await self._fetch_activities(window_start)
+        return await run_sync(self._complete_sync, after_timestamp, sync_state, window_start, fetched_activities)
+
+    async def _fetch_activities(self, after_timestamp: float) -> list:
+        """Busca todas as páginas de atividades após o timestamp informado"""
+        pages = _PageBatches()
+
+        # Mesma busca especulativa em lotes da versão síncrona, com corrotinas em vez de threads
+        while True:
+            batch = pages.next_batch()
+            if batch is None:
+                return pages.activities
+
+            tasks = [asyncio.ensure_future(self._fetch_page(after_timestamp, batch_page)) for batch_page in batch]
+            try:
+                results = await asyncio.gather(*tasks)
+            finally:
+                # O gather não cancela as demais páginas quando uma falha
+                for task in tasks:
+                    task.cancel()
+
+            for activities in results:
+                if not pages.add(activities):
+                    break
+
+    async def _fetch_page(self, after_timestamp: float, page: int) -> list:
+        """Busca uma página de atividades, mapeando falhas para exceções Strava"""
+        while True:
+            try:
+                response = await self._get(
+                    f"{self.base_url}/athlete/activities",
+                    params={
+                        "after": after_timestamp,
+                        "page": page,
+                        "per_page": QUANTITY_PER_PAGE,
+                    },
+                )
+
+                if not _check_page_response(response):
+                    await run_sync(self.rate_limiter.record_rate_limited, response)
+                    continue
+                return response.json()
+
+            except StravaAPIError:
+                raise
+            except Exception as e:
+                raise _map_request_error(e)
@@ -1,9 +1,20 @@
 import time
 from urllib.parse import urlencode
 
+import httpx
 import requests
 from django.conf import settings
 
+from .activity_store import ActivityStore
+from .executor import run_sync
+from .http_client import async_request, get_http_session
+from .metrics import count_upstream, timed
+from .single_flight import SingleFlight
+
+# Vários requests com o mesmo refresh token (ex.: abas abertas) renovam uma única vez.
+# Os tokens não passam pelo cache: outros workers os leem do banco, onde o líder os grava
+_token_refresh_flight = SingleFlight("token_refresh")
+
 
 class StravaAuthService:
     def __init__(self):
@@ -22,36 +33,38 @@ class StravaAuthService:
         }
         return f"{self.auth_url}?{urlencode(params)}"
 
+    def _get_token_payload(self, grant_type: str, **fields) -> dict:
+        return {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            **fields,
+            "grant_type": grant_type,
+        }
+
     def exchange_code_for_token(self, code: str) -> dict:
-        response = requests.post(
+        response = get_http_session().post(
             self.token_url,
-            data={
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-            },
+            data=self._get_token_payload("authorization_code", code=code),
         )
+        count_upstream("oauth/token", response.status_code)
         response.raise_for_status()
         return response.json()
 
     def refresh_token(self, refresh_token: str) -> dict:
-        response = requests.post(
-            self.token_url,
-            data={
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "refresh_token": refresh_token,
-                "grant_type": "refresh_token",
-            },
-        )
+        with timed("token_refresh"):
+            response = get_http_session().post(
+                self.token_url,
+                data=self._get_token_payload("refresh_token", refresh_token=refresh_token),
+            )
+        count_upstream("oauth/token", response.status_code)
         response.raise_for_status()
         return response.json()
 
     def is_token_expired(self, expires_at: int) -> bool:
         return time.time() >= expires_at
 
-    def get_valid_token(self, session_data: dict) -> dict | None:
+    def get_valid_token(self, session_data: dict, athlete_id: int = None) -> dict | None:
+        """Token válido da sessão, renovado se expirado; com athlete_id a renovação é gravada no atleta"""
         if not session_data.get("access_token"):
             return None
 
@@ -60,9 +73,88 @@ class StravaAuthService:
             if not refresh_token:
                 return None
             try:
-                new_token_data = self.refresh_token(refresh_token)
+                new_token_data = _token_refresh_flight.do(
+                    refresh_token,
+                    lambda: self._refresh_and_save(refresh_token, athlete_id),
+                    poll=lambda: self._get_saved_token(athlete_id),
+                )
                 return new_token_data
             except requests.RequestException:
                 return None
 
         return session_data
+
+    def _refresh_and_save(self, refresh_token: str, athlete_id: int = None) -> dict:
+        # Gravar antes de liberar o lock: é daí que os seguidores de outros workers leem
+        token_data = self.refresh_token(refresh_token)
+        if athlete_id:
+            ActivityStore.save_tokens(athlete_id, token_data)
+        return token_data
+
+    def _get_saved_token(self, athlete_id: int = None) -> dict | None:
+        """Token renovado por outro worker, se o atleta já tiver um ainda válido"""
+        if not athlete_id:
+            return None
+        token_data = ActivityStore.get_tokens(athlete_id)
+        if token_data is None or self.is_token_expired(token_data["expires_at"] or 0):
+            return None
+        return token_data
+
+    def get_athlete_token(self, athlete) -> dict | None:
+        """Token válido a partir dos tokens salvos do atleta, persistindo a renovação"""
+        session_data = {
+            "access_token": athlete.access_token,
+            "refresh_token": athlete.refresh_token,
+            "expires_at": athlete.token_expires_at or 0,
+        }
+        token_data = self.get_valid_token(session_data, athlete.id)
+
+        if token_data and token_data != session_data:
+            ActivityStore.save_tokens(athlete.id, token_data)
+        return token_data
+
+
+class AsyncStravaAuthService(StravaAuthService):
+    """Versão assíncrona (httpx) das chamadas de token do StravaAuthService"""
+
+    async def exchange_code_for_token(self, code: str) -> dict:
+        response = await async_request(
+            "POST", self.token_url, data=self._get_token_payload("authorization_code", code=code)
+        )
+        count_upstream("oauth/token", response.status_code)
+        response.raise_for_status()
+        return response.json()
+
+    async def refresh_token(self, refresh_token: str) -> dict:
+        with timed("token_refresh"):
+            response = await async_request(
+                "POST", self.token_url, data=self._get_token_payload("refresh_token", refresh_token=refresh_token)
+            )
+        count_upstream("oauth/token", response.status_code)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_valid_token(self, session_data: dict, athlete_id: int = None) -> dict | None:
+        if not session_data.get("access_token"):
+            return None
+
+        if self.is_token_expired(session_data.get("expires_at", 0)):
+            refresh_token = session_data.get("refresh_token")
+            if not refresh_token:
+                return None
+            try:
+                return await _token_refresh_flight.ado(
+                    refresh_token,
+                    lambda: self._refresh_and_save(refresh_token, athlete_id),
+                    poll=lambda: self._get_saved_token(athlete_id),
+                )
+            except httpx.HTTPError:
+                return None
+
+        return session_data
+
+    async def _refresh_and_save(self, refresh_token: str, athlete_id: int = None) -> dict:
+        token_data = await self.refresh_token(refresh_token)
+        if athlete_id:
+            await run_sync(ActivityStore.save_tokens, athlete_id, token_data)
+        return token_data
@@ -0,0 +1,92 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from ..exceptions import StravaAPIError, StravaRateLimitError, StravaTokenExpiredError
+from .activity_store import ActivityStore
+from .rate_limiter import StravaRateLimiter
+from .statistics import StatisticsService
+from .strava_api import StravaAPIService
+from .strava_auth import StravaAuthService
+
+logger = logging.getLogger(__name__)
+
+
+class ActivitySyncService:
+    """
+    Sincroniza as atividades dos atletas conhecidos fora do ciclo dos requests,
+    usando os tokens salvos no banco. O resultado vai para o armazenamento e para o
+    cache, de modo que a próxima visita ao dashboard seja apenas uma leitura.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max(1, max_workers or settings.STRAVA_SYNC_WORKERS)
+        self.rate_limiter = StravaRateLimiter()
+        self.auth_service = StravaAuthService()
+
+    def sync_all(self, athlete_ids: list = None) -> list:
+        """
+        Sincroniza os atletas em um pool limitado de threads. Atletas que não cabem no
+        orçamento da API Strava ficam para a próxima execução.
+        """
+        athletes = ActivityStore.get_syncable_athletes(athlete_ids)
+        logger.info(f"Sincronizando {len(athletes)} atletas com {self.max_workers} workers")
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="strava-sync") as executor:
+            futures = []
+            for athlete in athletes:
+                # Reservar orçamento para o atleta e os ainda pendentes; os concluídos já estão no uso
+                pending = sum(not future.done() for future in futures)
+                if not self.rate_limiter.has_budget(settings.STRAVA_SYNC_BUDGET_PER_ATHLETE * (pending + 1)):
+                    results.append({"athlete_id": athlete.id, "status": "skipped", "detail": "sem orçamento da API"})
+                    continue
+                futures.append(executor.submit(self._sync_in_thread, athlete))
+
+            results.extend(future.result() for future in futures)
+
+        return results
+
+    def _sync_in_thread(self, athlete) -> dict:
+        try:
+            return self.sync_athlete(athlete)
+        finally:
+            # Threads do pool não pertencem a um request: liberar a conexão com o banco
+            connections.close_all()
+
+    def sync_athlete(self, athlete) -> dict:
+        """Renova o token se preciso, busca as atividades e pré-calcula as estatísticas"""
+        started = time.monotonic()
+        result = {"athlete_id": athlete.id}
+
+        try:
+            token_data = self.auth_service.get_athlete_token(athlete)
+            if not token_data:
+                result.update(status="error", detail="token inválido ou revogado")
+                return result
+
+            api_service = StravaAPIService(
+                token_data["access_token"], athlete.id, max_wait=settings.STRAVA_RATE_LIMIT_BACKGROUND_MAX_WAIT
+            )
+            activities = api_service.get_all_activities(force_refresh=True)
+            if activities and api_service.data_version:
+                StatisticsService.warm_cache(activities, athlete.id, api_service.data_version)
+
+            result.update(status="ok", activities=len(activities))
+        except StravaRateLimitError as e:
+            result.update(status="skipped", detail=str(e))
+        except StravaTokenExpiredError as e:
+            result.update(status="error", detail=str(e))
+        except StravaAPIError as e:
+            logger.error(f"Erro ao sincronizar atleta {athlete.id}: {e}")
+            result.update(status="error", detail=str(e))
+        except Exception as e:
+            logger.error(f"Erro inesperado ao sincronizar atleta {athlete.id}: {e}", exc_info=True)
+            result.update(status="error", detail="erro inesperado")
+
+        result["seconds"] = round(time.monotonic() - started, 2)
+        logger.info(f"Sincronização do atleta {athlete.id}: {result}")
+        return result
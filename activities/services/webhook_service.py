@@ -0,0 +1,220 @@
+import logging
+import threading
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..exceptions import StravaAPIError
+from ..models import Athlete, WebhookEvent
+from .activity_store import ActivityStore
+from .cache_service import CacheService
+from .strava_api import StravaAPIService
+from .strava_auth import StravaAuthService
+
+logger = logging.getLogger(__name__)
+
+OBJECT_TYPES = ("activity", "athlete")
+ASPECT_TYPES = ("create", "update", "delete")
+
+# Reivindicação mais antiga que isso é de um worker encerrado no meio do evento
+CLAIM_TIMEOUT = 300
+MAX_ATTEMPTS = 3
+
+_wakeup = threading.Event()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+class StravaWebhookService:
+    """
+    Processa eventos de push do Strava (webhooks): cada evento atualiza apenas a
+    atividade afetada no armazenamento e no cache, gerando uma nova versão dos dados.
+    O endpoint não é autenticado: o conteúdo do evento é sempre confirmado na API Strava
+    antes de alterar ou apagar dados.
+    """
+
+    def __init__(self):
+        self.auth_service = StravaAuthService()
+
+    @staticmethod
+    def verify_subscription(params) -> str | None:
+        """Valida o handshake de criação da inscrição; retorna o hub.challenge"""
+        verify_token = settings.STRAVA_WEBHOOK_VERIFY_TOKEN
+        if (
+            params.get("hub.mode") != "subscribe"
+            or not verify_token
+            or params.get("hub.verify_token") != verify_token
+        ):
+            return None
+        return params.get("hub.challenge")
+
+    @staticmethod
+    def is_configured() -> bool:
+        """Eventos só são aceitos com o id da inscrição configurado"""
+        return bool(settings.STRAVA_WEBHOOK_SUBSCRIPTION_ID)
+
+    @staticmethod
+    def is_valid_event(event) -> bool:
+        if not isinstance(event, dict):
+            return False
+        if event.get("object_type") not in OBJECT_TYPES or event.get("aspect_type") not in ASPECT_TYPES:
+            return False
+        if not isinstance(event.get("object_id"), int) or not isinstance(event.get("owner_id"), int):
+            return False
+
+        return event.get("subscription_id") == settings.STRAVA_WEBHOOK_SUBSCRIPTION_ID
+
+    @staticmethod
+    def enqueue(event: dict) -> bool:
+        """
+        Grava o evento no banco e acorda a thread de processamento; False se a fila
+        estiver cheia. Gravado antes da resposta, o evento sobrevive ao reinício do
+        worker e fica para o próximo processamento, deste ou de outro worker.
+        """
+        if WebhookEvent.objects.count() >= settings.STRAVA_WEBHOOK_QUEUE_SIZE:
+            logger.error("Fila de eventos do webhook cheia, evento descartado")
+            return False
+
+        WebhookEvent.objects.create(payload=event)
+        _start_worker()
+        _wakeup.set()
+        return True
+
+    def process_pending(self) -> int:
+        """Processa os eventos pendentes, inclusive os deixados por workers encerrados; retorna quantos"""
+        processed = 0
+        while True:
+            event = self._claim_next()
+            if event is None:
+                return processed
+
+            if event.attempts > MAX_ATTEMPTS:
+                logger.error(f"Evento do webhook {event.payload} descartado após {MAX_ATTEMPTS} tentativas")
+            else:
+                self._process_safely(event.payload)
+            event.delete()
+            processed += 1
+
+    @staticmethod
+    def _claim_next() -> WebhookEvent | None:
+        """Reivindica o evento pendente mais antigo; o update condicional impede que dois workers o peguem"""
+        while True:
+            stale_before = timezone.now() - timedelta(seconds=CLAIM_TIMEOUT)
+            event = WebhookEvent.objects.filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=stale_before)).first()
+            if event is None:
+                return None
+
+            claimed_at = timezone.now()
+            claimed = WebhookEvent.objects.filter(id=event.id, claimed_at=event.claimed_at).update(
+                claimed_at=claimed_at, attempts=F("attempts") + 1
+            )
+            if claimed:
+                event.claimed_at = claimed_at
+                event.attempts += 1
+                return event
+
+    def _process_safely(self, event: dict):
+        try:
+            self.process_event(event)
+        except StravaAPIError as e:
+            logger.error(f"Erro na API Strava ao processar evento do webhook {event}: {e}")
+        except Exception as e:
+            logger.error(f"Erro inesperado ao processar evento do webhook {event}: {e}", exc_info=True)
+
+    def process_event(self, event: dict):
+        """Aplica um evento: atividade criada/alterada/excluída ou atleta que revogou o acesso"""
+        owner_id = event["owner_id"]
+
+        athlete = Athlete.objects.filter(id=owner_id).exclude(refresh_token="").first()
+        if athlete is None:
+            logger.info(f"Webhook: atleta {owner_id} sem tokens salvos, evento ignorado")
+            return
+
+        if event["object_type"] == "athlete":
+            if str((event.get("updates") or {}).get("authorized", "")).lower() == "false":
+                self._deauthorize(athlete)
+            return
+
+        token_data = self.auth_service.get_athlete_token(athlete)
+        if not token_data:
+            logger.warning(f"Webhook: token inválido para o atleta {owner_id}")
+            return
+
+        # Criação, alteração e exclusão seguem o estado atual no Strava, nunca o evento
+        activity = StravaAPIService(token_data["access_token"], owner_id).get_activity(event["object_id"])
+        if activity is None:
+            # Atividade excluída (404) ou privada: não deve mais aparecer
+            ActivityStore.delete_activity(owner_id, event["object_id"])
+        else:
+            ActivityStore.upsert_activity(owner_id, activity)
+        self._apply_to_cache(owner_id, event["object_id"], activity)
+        logger.info(f"Webhook: atividade {event['object_id']} do atleta {owner_id} atualizada ({event['aspect_type']})")
+
+    @staticmethod
+    def _apply_to_cache(athlete_id: int, activity_id: int, activity: dict = None):
+        """Substitui (ou remove) a atividade no conjunto em cache e grava a nova versão"""
+        sync_state = CacheService.get_sync_state(athlete_id)
+        cached_activities = CacheService.get_activities(athlete_id) if sync_state is not None else None
+        if cached_activities is None:
+            # Sem conjunto em cache para corrigir: a próxima leitura parte do banco
+            CacheService.invalidate_user_cache(athlete_id)
+            return
+
+        after_timestamp = sync_state["after_timestamp"]
+        activities = [item for item in cached_activities if item["id"] != activity_id]
+        if activity is not None and StravaAPIService._get_activity_timestamp(activity) > after_timestamp:
+            activities.append(activity)
+            activities.sort(key=StravaAPIService._get_activity_timestamp)
+
+        CacheService.set_sync_state(athlete_id, {
+            **sync_state,
+            "watermark": StravaAPIService._get_watermark(activities, after_timestamp),
+        })
+        CacheService.set_activities(athlete_id, activities)
+
+    def _deauthorize(self, athlete: Athlete):
+        """O atleta revogou o acesso: confirmado pela falha na renovação do token, apagar seus dados"""
+        try:
+            token_data = self.auth_service.refresh_token(athlete.refresh_token)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in (400, 401):
+                raise StravaAPIError(f"Erro ao confirmar revogação do atleta {athlete.id}: {e}")
+        except requests.RequestException as e:
+            raise StravaAPIError(f"Erro ao confirmar revogação do atleta {athlete.id}: {e}")
+        else:
+            # O token ainda renova: o acesso não foi revogado
+            ActivityStore.save_tokens(athlete.id, token_data)
+            logger.warning(f"Webhook: revogação do atleta {athlete.id} não confirmada pelo Strava, evento ignorado")
+            return
+
+        ActivityStore.delete_athlete(athlete.id)
+        CacheService.delete_sync_state(athlete.id)
+        CacheService.invalidate_user_cache(athlete.id)
+        logger.info(f"Webhook: atleta {athlete.id} revogou o acesso, dados removidos")
+
+
+def _start_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_process_events, name="strava-webhook", daemon=True)
+            _worker.start()
+
+
+def _process_events():
+    service = StravaWebhookService()
+    while True:
+        _wakeup.wait()
+        # Limpar antes de processar: eventos gravados durante o processamento acordam de novo
+        _wakeup.clear()
+        try:
+            service.process_pending()
+        except Exception as e:
+            logger.error(f"Erro ao processar eventos do webhook: {e}", exc_info=True)
+        finally:
+            # A thread não pertence a um request: liberar a conexão com o banco
+            connections.close_all()
@@ -10,5 +10,8 @@ urlpatterns = [
     path("auth/callback/", views.strava_callback, name="strava_callback"),
     path("auth/logout/", views.strava_logout, name="strava_logout"),
     path("dashboard/", views.dashboard, name="dashboard"),
+    path("api/dashboard/activities/", views.activities_feed, name="activities_feed"),
     path("api/activities/<str:sport_type>/", views.activities_by_sport, name="activities_by_sport"),
+    path("webhook/", views.strava_webhook, name="strava_webhook"),
+    path("metrics/", views.metrics, name="metrics"),
 ]
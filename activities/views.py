@@ -1,12 +1,27 @@
+import hmac
+import json
 import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
-
-from .services import StatisticsService, StravaAPIService, StravaAuthService
-from .exceptions import StravaAPIError, StravaAuthenticationError, StravaTokenExpiredError
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .services import (
+    ActivityStore,
+    AsyncStravaAPIService,
+    AsyncStravaAuthService,
+    StatisticsService,
+    StravaAuthService,
+    StravaWebhookService,
+)
+from .services.executor import run_sync
+from .services.metrics import registry, timed
+from .services.profiling import annotate
+from .exceptions import InvalidCursorError, StravaAPIError, StravaAuthenticationError, StravaTokenExpiredError
 
 logger = logging.getLogger(__name__)
 
@@ -26,28 +41,61 @@ MONTH_NAMES_PT_BR = [
 ]
 
 
-def _get_month_filters() -> list:
-    current_month = datetime.now(ZoneInfo("America/Sao_Paulo")).month
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 100
+
+
+def _get_month_filters(year: int) -> list:
+    today = datetime.now(ZoneInfo("America/Sao_Paulo"))
+    # Anos passados mostram todos os meses; o atual, até o mês corrente
+    last_month = today.month if year >= today.year else 12
     return [
         {"value": month_number, "label": MONTH_NAMES_PT_BR[month_number - 1]}
-        for month_number in range(1, current_month + 1)
+        for month_number in range(1, last_month + 1)
     ]
 
 
-def _get_strava_session(request) -> dict | None:
-    auth_service = StravaAuthService()
-    session_data = {
+def _get_session_tokens(request) -> dict:
+    return {
         "access_token": request.session.get("access_token"),
         "refresh_token": request.session.get("refresh_token"),
         "expires_at": request.session.get("expires_at"),
     }
 
-    valid_token = auth_service.get_valid_token(session_data)
+
+def _save_session_tokens(request, valid_token: dict):
+    request.session["access_token"] = valid_token.get("access_token")
+    request.session["refresh_token"] = valid_token.get("refresh_token")
+    request.session["expires_at"] = valid_token.get("expires_at")
+
+    # Manter os tokens salvos em dia para a sincronização em segundo plano
+    if request.session.get("athlete_id"):
+        ActivityStore.save_tokens(request.session["athlete_id"], valid_token)
+
+
+def _get_strava_session(request) -> dict | None:
+    auth_service = StravaAuthService()
+    session_data = _get_session_tokens(request)
+
+    valid_token = auth_service.get_valid_token(session_data, request.session.get("athlete_id"))
 
     if valid_token and valid_token != session_data:
-        request.session["access_token"] = valid_token.get("access_token")
-        request.session["refresh_token"] = valid_token.get("refresh_token")
-        request.session["expires_at"] = valid_token.get("expires_at")
+        _save_session_tokens(request, valid_token)
+
+    return valid_token
+
+
+async def _aget_strava_session(request) -> dict | None:
+    # Sessão e banco são síncronos: rodar no executor; a renovação do token é assíncrona
+    with timed("token"):
+        session_data = await run_sync(_get_session_tokens, request)
+
+        valid_token = await AsyncStravaAuthService().get_valid_token(
+            session_data, await request.session.aget("athlete_id")
+        )
+
+        if valid_token and valid_token != session_data:
+            await run_sync(_save_session_tokens, request, valid_token)
 
     return valid_token
 
@@ -88,9 +136,16 @@ def strava_callback(request):
         request.session["expires_at"] = token_data.get("expires_at")
 
         athlete = token_data.get("athlete", {})
+        request.session["athlete_id"] = athlete.get("id")
         request.session["athlete_name"] = f"{athlete.get('firstname', '')} {athlete.get('lastname', '')}".strip()
         request.session["athlete_profile"] = athlete.get("profile")
 
+        if athlete.get("id"):
+            ActivityStore.upsert_athlete(
+                athlete["id"], request.session["athlete_name"], request.session["athlete_profile"]
+            )
+            ActivityStore.save_tokens(athlete["id"], token_data)
+
         return redirect("activities:dashboard")
 
     except StravaAuthenticationError as e:
@@ -106,96 +161,146 @@ def strava_logout(request):
     return redirect("activities:index")
 
 
-def dashboard(request):
-    session_data = _get_strava_session(request)
+async def _get_statistics_service(request, session_data: dict) -> StatisticsService:
+    with timed("activities"):
+        api_service = await _get_api_service(request, session_data)
+        # Com o cache válido o payload não é decodificado: None e o frame vem do cache/banco
+        activities = await api_service.ensure_activities()
+
+    # Montagem do DataFrame (pandas) fora do event loop
+    with timed("dataframe"):
+        stats_service = await run_sync(
+            StatisticsService,
+            activities,
+            api_service.athlete_id,
+            data_version=api_service.data_version,
+            year=_get_year(request),
+        )
+
+    # Tamanho do histórico no perfil do request, quando ele está sendo amostrado
+    annotate(athlete_id=api_service.athlete_id, activities=stats_service.history_size,
+             year=stats_service.year, year_activities=len(stats_service.df))
+    return stats_service
+
+
+async def _get_api_service(request, session_data: dict) -> AsyncStravaAPIService:
+    # Cache separado pelo id do atleta; sessões antigas sem o id resolvem via /athlete
+    api_service = AsyncStravaAPIService(session_data["access_token"], await request.session.aget("athlete_id"))
+    if api_service.athlete_id is None:
+        api_service.athlete_id = (await api_service.get_athlete())["id"]
+        await request.session.aset("athlete_id", api_service.athlete_id)
+    return api_service
+
+
+async def _render(request, template_name: str, context: dict = None):
+    # Renderização (e context processors que podem acessar o banco) fora do event loop
+    with timed("render"):
+        return await run_sync(render, request, template_name, context)
+
+
+def _get_filters(request) -> dict:
+    return {
+        "sport": request.GET.get("sport", ""),
+        "week": request.GET.get("week", ""),
+        "month": request.GET.get("month", ""),
+        "search": request.GET.get("search", ""),
+    }
+
+
+def _get_year(request) -> int:
+    available_years = StatisticsService.get_available_years()
+    try:
+        year = int(request.GET.get("year", available_years[0]))
+    except ValueError:
+        year = available_years[0]
+    return year if year in available_years else available_years[0]
+
+
+def _get_per_page(request) -> int:
+    try:
+        per_page = int(request.GET.get("per_page", DEFAULT_PER_PAGE))
+    except ValueError:
+        per_page = DEFAULT_PER_PAGE
+    return min(max(per_page, 1), MAX_PER_PAGE)
+
+
+def _get_dashboard_context(request, stats_service: StatisticsService) -> dict:
+    # Paginação por cursor: a primeira página vai no HTML, as demais via activities_feed
+    per_page = _get_per_page(request)
+
+    # Filtros
+    filters = _get_filters(request)
+
+    # Aplicar filtros antes da paginação (visão filtrada compartilha o frame já processado)
+    filtered_stats_service = stats_service.filtered(
+        filters["sport"], filters["week"], filters["month"], filters["search"]
+    )
+    dashboard_stats = filtered_stats_service.get_dashboard_statistics()
+    total_general_stats = stats_service.get_general_statistics()
+
+    return {
+        "athlete_name": request.session.get("athlete_name", "Atleta"),
+        "athlete_profile": request.session.get("athlete_profile"),
+        "general_stats": dashboard_stats.general,
+        "total_general_stats": total_general_stats,
+        "monthly_stats": dashboard_stats.monthly,
+        "month_filters": _get_month_filters(stats_service.year),
+        "activity_type_stats": dashboard_stats.activity_types,
+        "weekly_stats": dashboard_stats.weekly,
+        "sport_types": stats_service.get_sport_types(),  # Manter todos os esportes para o select
+        # Primeira página de atividades; as seguintes são carregadas sob demanda
+        "activities_page": filtered_stats_service.get_activities_page(per_page=per_page),
+        # Filtros ativos para o template
+        "current_filters": filters,
+        "year_options": StatisticsService.get_available_years(),
+        "selected_year": stats_service.year,
+    }
+
+
+def _get_feed_page(request, stats_service: StatisticsService) -> dict:
+    filters = _get_filters(request)
+    filtered_stats_service = stats_service.filtered(
+        filters["sport"], filters["week"], filters["month"], filters["search"]
+    )
+    return filtered_stats_service.get_activities_page(request.GET.get("cursor"), _get_per_page(request))
+
+
+async def dashboard(request):
+    session_data = await _aget_strava_session(request)
 
     if not session_data:
         return redirect("activities:index")
 
     try:
-        # Usar user_id da sessão para cache
-        user_id = request.session.get("athlete_name", "anonymous") or "default"
-        api_service = StravaAPIService(session_data["access_token"], user_id)
-        activities = api_service.get_all_activities()
-
-        stats_service = StatisticsService(activities, user_id)
-
-        # Paginação
-        page = int(request.GET.get("page", 1))
-        per_page = int(request.GET.get("per_page", 50))
-        
-        # Filtros
-        sport_filter = request.GET.get("sport", "")
-        week_filter = request.GET.get("week", "")
-        month_filter = request.GET.get("month", "")
-        search_filter = request.GET.get("search", "")
-        
-        # Validar página
-        if page < 1:
-            page = 1
-
-        # Aplicar filtros antes da paginação
-        filtered_activities = stats_service.get_filtered_activities(
-            sport_filter, week_filter, month_filter, search_filter
-        )
+        stats_service = await _get_statistics_service(request, session_data)
+        with timed("statistics"):
+            context = await run_sync(_get_dashboard_context, request, stats_service)
 
-        # Criar novo StatisticsService com dados filtrados
-        filtered_stats_service = StatisticsService(filtered_activities, user_id, use_cache=False)
-        filtered_general_stats = filtered_stats_service.get_general_statistics()
-        total_general_stats = stats_service.get_general_statistics()
-
-        paginated_activities = filtered_stats_service.get_all_activities_paginated(page, per_page)
-
-        context = {
-            "athlete_name": request.session.get("athlete_name", "Atleta"),
-            "athlete_profile": request.session.get("athlete_profile"),
-            "general_stats": filtered_general_stats,
-            "total_general_stats": total_general_stats,
-            "monthly_stats": filtered_stats_service.get_monthly_statistics(),
-            "month_filters": _get_month_filters(),
-            "activity_type_stats": filtered_stats_service.get_activity_type_statistics(),
-            "weekly_stats": filtered_stats_service.get_weekly_statistics(),
-            "sport_types": stats_service.get_sport_types(),  # Manter todos os esportes para o select
-            # Dados paginados para exibição
-            "activities_page": paginated_activities,
-            # Todas as atividades filtradas para os filtros JavaScript funcionarem
-            "all_activities": filtered_stats_service.get_all_activities(),
-            # Filtros ativos para o template
-            "current_filters": {
-                "sport": sport_filter,
-                "week": week_filter,
-                "month": month_filter,
-                "search": search_filter,
-            }
-        }
-
-        return render(request, "activities/dashboard.html", context)
+        return await _render(request, "activities/dashboard.html", context)
 
     except StravaTokenExpiredError as e:
         logger.error(f"Token Strava expirado: {e}")
         # Limpar sessão e redirecionar para login
-        request.session.flush()
-        return render(request, "activities/error.html", {"error": "Sua sessão expirou. Por favor, faça login novamente."})
+        await request.session.aflush()
+        return await _render(request, "activities/error.html", {"error": "Sua sessão expirou. Por favor, faça login novamente."})
     except StravaAPIError as e:
         logger.error(f"Erro na API Strava: {e}")
-        return render(request, "activities/error.html", {"error": f"Erro ao carregar dados do Strava: {e}"})
+        return await _render(request, "activities/error.html", {"error": f"Erro ao carregar dados do Strava: {e}"})
     except Exception as e:
         logger.error(f"Erro inesperado no dashboard: {e}", exc_info=True)
-        return render(request, "activities/error.html", {"error": "Erro ao carregar o dashboard"})
+        return await _render(request, "activities/error.html", {"error": "Erro ao carregar o dashboard"})
 
 
-def activities_by_sport(request, sport_type: str):
-    session_data = _get_strava_session(request)
+async def activities_by_sport(request, sport_type: str):
+    session_data = await _aget_strava_session(request)
 
     if not session_data:
         return JsonResponse({"error": "Não autenticado"}, status=401)
 
     try:
-        api_service = StravaAPIService(session_data["access_token"])
-        activities = api_service.get_all_activities()
-
-        stats_service = StatisticsService(activities)
-        filtered_activities = stats_service.get_activities_by_sport_type(sport_type)
+        stats_service = await _get_statistics_service(request, session_data)
+        with timed("statistics"):
+            filtered_activities = await run_sync(stats_service.get_activities_by_sport_type, sport_type)
 
         return JsonResponse({"activities": filtered_activities})
 
@@ -205,3 +310,70 @@ def activities_by_sport(request, sport_type: str):
     except Exception as e:
         logger.error(f"Erro inesperado ao filtrar atividades: {e}", exc_info=True)
         return JsonResponse({"error": "Erro ao processar solicitação"}, status=500)
+
+
+async def activities_feed(request):
+    """Atividades filtradas em JSON, paginadas por cursor, para a tabela do dashboard"""
+    session_data = await _aget_strava_session(request)
+
+    if not session_data:
+        return JsonResponse({"error": "Não autenticado"}, status=401)
+
+    try:
+        stats_service = await _get_statistics_service(request, session_data)
+        with timed("statistics"):
+            page = await run_sync(_get_feed_page, request, stats_service)
+
+        return JsonResponse(page)
+
+    except InvalidCursorError:
+        return JsonResponse({"error": "Cursor inválido"}, status=400)
+    except StravaTokenExpiredError as e:
+        logger.error(f"Token Strava expirado: {e}")
+        return JsonResponse({"error": "Sessão expirada"}, status=401)
+    except StravaAPIError as e:
+        logger.error(f"Erro na API Strava: {e}")
+        return JsonResponse({"error": f"Erro ao carregar atividades: {e}"}, status=500)
+    except Exception as e:
+        logger.error(f"Erro inesperado ao listar atividades: {e}", exc_info=True)
+        return JsonResponse({"error": "Erro ao processar solicitação"}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def strava_webhook(request):
+    """Inscrição (GET, handshake) e eventos (POST) de push do Strava"""
+    if request.method == "GET":
+        challenge = StravaWebhookService.verify_subscription(request.GET)
+        if challenge is None:
+            return JsonResponse({"error": "Token de verificação inválido"}, status=403)
+        return JsonResponse({"hub.challenge": challenge})
+
+    if not StravaWebhookService.is_configured():
+        return JsonResponse({"error": "Webhook não configurado"}, status=403)
+
+    try:
+        event = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+
+    if not StravaWebhookService.is_valid_event(event):
+        return JsonResponse({"error": "Evento inválido"}, status=400)
+
+    # O Strava espera resposta em até 2 segundos: processar em segundo plano
+    if not StravaWebhookService.enqueue(event):
+        return JsonResponse({"error": "Fila de eventos cheia"}, status=503)
+    return HttpResponse(status=200)
+
+
+def metrics(request):
+    """Histogramas, acertos de cache e chamadas ao Strava no formato texto do Prometheus"""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+            return HttpResponse(status=401)
+
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,7 +1,9 @@
 #!/bin/sh
+set -e
 
 echo "Running migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "Starting server..."
 exec "$@"
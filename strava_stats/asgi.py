@@ -0,0 +1,35 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "strava_stats.settings")
+
+django_application = get_asgi_application()
+
+# Import depois do setup do Django
+from activities.services.http_client import (  # noqa: E402
+    close_async_http_client,
+    register_server_loop,
+)
+
+
+async def application(scope, receive, send):
+    """Aplicação Django com o ciclo de vida (lifespan) do cliente HTTP assíncrono"""
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+
+    # Servidores sem lifespan: o loop é registrado no primeiro request
+    register_server_loop()
+    return await django_application(scope, receive, send)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            register_server_loop()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_http_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
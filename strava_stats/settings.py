@@ -27,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da cadeia para medir o request inteiro (inativo sem METRICS_ENABLED)
+    "activities.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,6 +36,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Depois da autenticação, para reconhecer o gatilho de usuários staff (inativo sem PROFILING_ENABLED)
+    "activities.middleware.SamplingProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "strava_stats.urls"
@@ -55,11 +59,18 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "strava_stats.wsgi.application"
+ASGI_APPLICATION = "strava_stats.asgi.application"
 
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Sincronização em threads: adquirir o lock de escrita no início da transação
+            # evita "database is locked" ao promover leitura para escrita
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
@@ -81,10 +92,12 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Cache Configuration
+# Compartilhado entre os workers (orçamento da API Strava): tabela no banco por padrão
+# (manage.py createcachetable); Redis com CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "strava-stats-cache",
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "strava_stats_cache"),
         "TIMEOUT": 3600,  # 1 hora
         "OPTIONS": {
             "MAX_ENTRIES": 1000,
@@ -113,8 +126,50 @@ TEMPLATES = [
 ]
 
 # Cache timeouts
-CACHE_TIMEOUT_ACTIVITIES = 3600  # 1 hora
+CACHE_TIMEOUT_ACTIVITIES = 3600  # 1 hora (TTL suave: depois disso, servido enquanto atualiza)
+# Tempo extra em que atividades vencidas ainda são servidas enquanto a atualização roda em segundo plano
+CACHE_STALE_TIMEOUT_ACTIVITIES = int(os.environ.get("CACHE_STALE_TIMEOUT_ACTIVITIES", 24 * 3600))
 CACHE_TIMEOUT_STATS = 1800     # 30 minutos
+CACHE_TIMEOUT_DATAFRAME = CACHE_TIMEOUT_ACTIVITIES + CACHE_STALE_TIMEOUT_ACTIVITIES
+CACHE_TIMEOUT_SYNC_STATE = 7 * 24 * 3600  # 7 dias
+
+# Nível de compressão (zlib, 0-9) das atividades serializadas no cache
+CACHE_COMPRESSION_LEVEL = int(os.environ.get("CACHE_COMPRESSION_LEVEL", 6))
+
+# Sincronização incremental de atividades
+STRAVA_FULL_SYNC_INTERVAL = int(os.environ.get("STRAVA_FULL_SYNC_INTERVAL", 24 * 3600))  # Reconciliação completa diária
+STRAVA_FETCH_CONCURRENCY = int(os.environ.get("STRAVA_FETCH_CONCURRENCY", 4))  # Páginas buscadas em paralelo
+STRAVA_SYNC_LOOKBACK_SECONDS = int(os.environ.get("STRAVA_SYNC_LOOKBACK_SECONDS", 2 * 24 * 3600))  # Janela para uploads atrasados
+STRAVA_HISTORY_YEARS = int(os.environ.get("STRAVA_HISTORY_YEARS", 3))  # Anos de histórico (incluindo o atual)
+
+# Coalescência de buscas concorrentes (single-flight) entre requests e workers
+SINGLE_FLIGHT_LOCK_TIMEOUT = int(os.environ.get("SINGLE_FLIGHT_LOCK_TIMEOUT", 120))  # Validade do lock no cache
+SINGLE_FLIGHT_WAIT_TIMEOUT = int(os.environ.get("SINGLE_FLIGHT_WAIT_TIMEOUT", 60))  # Espera máxima pelo resultado
+CACHE_REFRESH_WORKERS = int(os.environ.get("CACHE_REFRESH_WORKERS", 2))  # Threads de atualização em segundo plano
+
+# Views assíncronas (ASGI): threads para pandas, cache e banco fora do event loop
+ASYNC_EXECUTOR_WORKERS = int(os.environ.get("ASYNC_EXECUTOR_WORKERS", 4))
+
+# Sincronização agendada (manage.py sync_activities)
+STRAVA_SYNC_WORKERS = int(os.environ.get("STRAVA_SYNC_WORKERS", 2))  # Atletas sincronizados em paralelo
+STRAVA_SYNC_INTERVAL = int(os.environ.get("STRAVA_SYNC_INTERVAL", 3600))  # Intervalo do modo --loop (segundos)
+STRAVA_SYNC_BUDGET_PER_ATHLETE = int(os.environ.get("STRAVA_SYNC_BUDGET_PER_ATHLETE", 5))  # Requisições reservadas por atleta
+
+# Métricas por request (cabeçalho Server-Timing e endpoint /metrics/ no formato Prometheus)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "False").lower() in ("true", "1", "yes")
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")  # Se definido, /metrics/ exige "Authorization: Bearer <token>"
+
+# Profiler por amostragem de pilhas (perfis resumidos com manage.py profile_summary)
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "False").lower() in ("true", "1", "yes")
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))  # Fração dos requests amostrados (0.01 = 1%)
+PROFILING_INTERVAL = float(os.environ.get("PROFILING_INTERVAL", 0.005))  # Intervalo entre amostras de pilha (segundos)
+PROFILING_DIR = os.environ.get("PROFILING_DIR", str(BASE_DIR / ".profiles"))
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", 200))  # Os perfis mais antigos são apagados
+
+# Webhook de eventos do Strava (push subscriptions)
+STRAVA_WEBHOOK_VERIFY_TOKEN = os.environ.get("STRAVA_WEBHOOK_VERIFY_TOKEN", "")  # Vazio desativa o handshake
+STRAVA_WEBHOOK_SUBSCRIPTION_ID = int(os.environ.get("STRAVA_WEBHOOK_SUBSCRIPTION_ID", 0))  # 0 recusa todos os eventos
+STRAVA_WEBHOOK_QUEUE_SIZE = int(os.environ.get("STRAVA_WEBHOOK_QUEUE_SIZE", 1000))  # Eventos pendentes no banco antes de recusar (503)
 
 # Logging Configuration
 LOGGING = {
@@ -154,6 +209,24 @@ LOGGING = {
 STRAVA_CLIENT_ID = os.environ.get("STRAVA_CLIENT_ID")
 STRAVA_CLIENT_SECRET = os.environ.get("STRAVA_CLIENT_SECRET")
 STRAVA_REDIRECT_URI = os.environ.get("STRAVA_REDIRECT_URI", "http://localhost:8000/strava-stats/auth/callback/")
-STRAVA_AUTH_URL = "https://www.strava.com/oauth/authorize"
-STRAVA_TOKEN_URL = "https://www.strava.com/api/v3/oauth/token"
-STRAVA_API_BASE_URL = "https://www.strava.com/api/v3"
+# URLs do Strava sobrescrevíveis para apontar o app para o servidor local (manage.py fake_strava)
+STRAVA_AUTH_URL = os.environ.get("STRAVA_AUTH_URL", "https://www.strava.com/oauth/authorize")
+STRAVA_TOKEN_URL = os.environ.get("STRAVA_TOKEN_URL", "https://www.strava.com/api/v3/oauth/token")
+STRAVA_API_BASE_URL = os.environ.get("STRAVA_API_BASE_URL", "https://www.strava.com/api/v3")
+
+# Cliente HTTP compartilhado (pool de conexões com keep-alive)
+STRAVA_HTTP_CONNECT_TIMEOUT = float(os.environ.get("STRAVA_HTTP_CONNECT_TIMEOUT", 5))
+STRAVA_HTTP_READ_TIMEOUT = float(os.environ.get("STRAVA_HTTP_READ_TIMEOUT", 30))
+STRAVA_HTTP_POOL_CONNECTIONS = 4  # Número de hosts com pool próprio
+STRAVA_HTTP_POOL_MAXSIZE = max(10, STRAVA_FETCH_CONCURRENCY)  # Conexões mantidas por host
+STRAVA_HTTP_MAX_RETRIES = int(os.environ.get("STRAVA_HTTP_MAX_RETRIES", 3))  # Apenas GETs idempotentes
+STRAVA_HTTP_BACKOFF_FACTOR = float(os.environ.get("STRAVA_HTTP_BACKOFF_FACTOR", 0.5))
+
+# Rate limit da API Strava (atualizado pelos cabeçalhos X-RateLimit-*; compartilhado via cache)
+STRAVA_RATE_LIMIT_15MIN = int(os.environ.get("STRAVA_RATE_LIMIT_15MIN", 100))
+STRAVA_RATE_LIMIT_DAILY = int(os.environ.get("STRAVA_RATE_LIMIT_DAILY", 1000))
+STRAVA_RATE_LIMIT_RESERVE = int(os.environ.get("STRAVA_RATE_LIMIT_RESERVE", 5))  # Folga mantida em cada janela
+STRAVA_RATE_LIMIT_MAX_WAIT = float(os.environ.get("STRAVA_RATE_LIMIT_MAX_WAIT", 5))  # Espera máxima por requisição nos requests web (s)
+# Sincronização e atualização em segundo plano: podem aguardar a próxima janela de 15 minutos
+STRAVA_RATE_LIMIT_BACKGROUND_MAX_WAIT = float(os.environ.get("STRAVA_RATE_LIMIT_BACKGROUND_MAX_WAIT", 15 * 60))
+STRAVA_RATE_LIMIT_PACING_THRESHOLD = 0.2  # Espaçar requisições quando restar menos de 20% da janela